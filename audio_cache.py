@@ -0,0 +1,155 @@
+import glob
+import hashlib
+import json
+import os
+import time
+import click
+import librosa
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "borboleto", "audio")
+TAMANHO_MAX = 512 * 1024 * 1024  # Orçamento padrão do cache em disco (512 MB)
+SR_PADRAO = 22050  # Taxa padrão do librosa.load
+VERSAO = 1  # Mude para invalidar todo o cache (ex.: nova forma de decodificar)
+TMP_ABANDONADO = 3600  # Segundos sem mudar para um .tmp ser considerado resto de gravação interrompida
+
+
+def chave_audio(audio_file, sr=SR_PADRAO, duration=None, mono=True):
+    """Chave do áudio decodificado: conteúdo do arquivo e parâmetros da decodificação.
+
+    O hash é do conteúdo, não do nome nem do mtime: se o arquivo mudar, a chave
+    muda e a entrada antiga só sai pelo limite de tamanho.
+    """
+    h = hashlib.sha256()
+    with open(audio_file, "rb") as f:
+        for parte in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(parte)
+    parametros = json.dumps({"sha256": h.hexdigest(), "sr": sr, "duration": duration, "mono": mono,
+                             "versao": VERSAO}, sort_keys=True)
+    return hashlib.sha256(parametros.encode("utf-8")).hexdigest()[:32]
+
+
+def procurar(chave, pasta=CACHE_DIR):
+    """(caminho, sr) da entrada em cache, ou None. A taxa fica no nome: <chave>_<sr>.npy."""
+    for caminho in glob.glob(os.path.join(pasta, f"{chave}_*.npy")):
+        try:
+            return caminho, int(os.path.basename(caminho)[len(chave) + 1:-4])
+        except ValueError:
+            continue
+    return None
+
+
+def entradas(pasta=CACHE_DIR):
+    """Arquivos do cache, do usado há mais tempo para o mais recente: [(caminho, bytes)].
+
+    Inclui os .tmp deixados por gravações interrompidas (ex.: processo morto), que
+    assim também contam no tamanho e saem por ``limitar``/``limpar``. Um .tmp
+    alterado há menos de ``TMP_ABANDONADO`` segundos ainda pode estar sendo gravado e fica de fora.
+    """
+    agora = time.time()
+    arquivos = []
+    for caminho in glob.glob(os.path.join(pasta, "*.npy")) + glob.glob(os.path.join(pasta, "*.npy.*.tmp")):
+        try:
+            stat = os.stat(caminho)
+        except OSError:
+            continue  # Removido por outro processo
+        if caminho.endswith(".tmp") and agora - stat.st_mtime < TMP_ABANDONADO:
+            continue
+        arquivos.append((stat.st_mtime_ns, caminho, stat.st_size))
+    return [(caminho, tamanho) for _, caminho, tamanho in sorted(arquivos)]
+
+
+def limitar(pasta=CACHE_DIR, tamanho_max=TAMANHO_MAX, manter=None):
+    """Apaga as entradas usadas há mais tempo até o cache caber em ``tamanho_max`` bytes.
+
+    ``manter`` (a entrada que acabou de ser gravada) nunca é apagada. Retorna quantas saíram.
+    """
+    arquivos = entradas(pasta)
+    total = sum(tamanho for _, tamanho in arquivos)
+    removidos = 0
+    for caminho, tamanho in arquivos:
+        if total <= tamanho_max:
+            break
+        if caminho == manter:
+            continue
+        try:
+            os.remove(caminho)
+        except OSError:
+            continue
+        total -= tamanho
+        removidos += 1
+    return removidos
+
+
+def limpar(pasta=CACHE_DIR):
+    """Apaga todo o cache. Retorna quantas entradas saíram."""
+    return limitar(pasta, tamanho_max=-1)
+
+
+def _abrir(caminho):
+    """Abre a entrada com mmap e marca como usada agora (para o descarte LRU)."""
+    y = np.load(caminho, mmap_mode="r")
+    if y.dtype != np.float32 or y.ndim != 1:
+        raise ValueError(f"{caminho}: esperado float32 mono, encontrado {y.dtype} {y.shape}")
+    os.utime(caminho)
+    return y
+
+
+def load(audio_file, sr=SR_PADRAO, duration=None, pasta=CACHE_DIR, tamanho_max=TAMANHO_MAX):
+    """Como ``librosa.load(audio_file, sr=sr, duration=duration)``, mas guardando o resultado.
+
+    Na primeira vez decodifica e grava um .npy float32 em ``pasta``; nas seguintes
+    devolve um ``np.memmap`` somente leitura desse arquivo, sem decodificar nada.
+    Entradas ilegíveis são apagadas e refeitas. Se não der para gravar o cache,
+    devolve o array decodificado em memória.
+    """
+    chave = chave_audio(audio_file, sr, duration)
+    encontrada = procurar(chave, pasta)
+    if encontrada is not None:
+        caminho, sr_salvo = encontrada
+        try:
+            return _abrir(caminho), sr_salvo
+        except (OSError, ValueError):
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+
+    y, sr_lido = librosa.load(audio_file, sr=sr, duration=duration)
+    caminho = os.path.join(pasta, f"{chave}_{sr_lido}.npy")
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(pasta, exist_ok=True)
+        with open(temporario, "wb") as f:
+            np.save(f, np.ascontiguousarray(y, dtype=np.float32))
+        os.replace(temporario, caminho)
+    except OSError:
+        # Cache só acelera: sem como gravar (pasta sem permissão, disco cheio) segue com o áudio já decodificado
+        return np.asarray(y, dtype=np.float32), sr_lido
+    finally:
+        # Se a gravação falhou, não deixar o .tmp para trás
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+    limitar(pasta, tamanho_max, manter=caminho)
+    return _abrir(caminho), sr_lido
+
+
+@click.command()
+@click.option("--pasta", default=CACHE_DIR, show_default=True, help="Pasta do cache.")
+@click.option("--limpar", "apagar", is_flag=True, help="Apaga todas as entradas.")
+@click.option("--tamanho-max", type=float, default=None, help="Reduz o cache até caber nesse tamanho (MB).")
+def main(pasta, apagar, tamanho_max):
+    """Mostra, reduz ou apaga o cache de áudio decodificado."""
+    if apagar:
+        click.echo(f"{limpar(pasta)} entradas apagadas")
+    elif tamanho_max is not None:
+        click.echo(f"{limitar(pasta, int(tamanho_max * 1024 * 1024))} entradas apagadas")
+    arquivos = entradas(pasta)
+    total = sum(tamanho for _, tamanho in arquivos)
+    click.echo(f"{pasta}: {len(arquivos)} entradas, {total / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
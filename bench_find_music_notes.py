@@ -0,0 +1,62 @@
+import time
+import click
+import librosa
+import numpy as np
+from find_music_notes import FRAME_LENGTH, HOP_LENGTH, find_notes
+from pitch import C0, NOTE_NAMES
+
+
+# Como era no find_music_notes.py, antes de pitch.frequencies_to_notes
+def frequency_to_note(freq):
+    h = round(12 * np.log2(freq / C0))
+    octave = h // 12
+    n = h % 12
+    if n >= 0 and n < len(NOTE_NAMES):
+        return NOTE_NAMES[n] + str(octave)
+    return None
+
+
+def find_notes_loop(y, sr, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+    """Laço quadro a quadro como era no find_music_notes.py (FFT complexa por quadro)."""
+    num_frames = int(np.ceil(len(y) / hop_length))
+    notes = []
+    for i in range(num_frames):
+        start = i * hop_length
+        end = start + frame_length
+        frame = y[start:end] if end <= len(y) else y[start:]
+        frequencies = np.abs(np.fft.fft(frame))
+        dominant_frequency = np.argmax(frequencies) * (sr / len(frame))
+        if dominant_frequency <= 0:
+            continue  # O original quebrava aqui (log2(0)) quando o DC dominava
+        note = frequency_to_note(dominant_frequency)
+        if note:
+            notes.append(note)
+    return notes
+
+
+def medir(funcao, y, sr, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        notes = funcao(y, sr)
+    return (time.perf_counter() - inicio) / repeticoes, notes
+
+
+@click.command()
+@click.argument('audio_file', default='todoenrolado.mp3')
+@click.option('--duracao', type=float, default=None, help='Segundos analisados (padrão: a faixa inteira).')
+@click.option('--repeticoes', default=3, help='Execuções por medição.')
+def main(audio_file, duracao, repeticoes):
+    """Compara o laço quadro a quadro com a STFT vetorizada."""
+    y, sr = librosa.load(audio_file, duration=duracao)
+    click.echo(f'{audio_file}: {len(y) / sr:.1f} s a {sr} Hz')
+
+    laco, notas_laco = medir(find_notes_loop, y, sr, repeticoes)
+    # Mesmo algoritmo do laço (maior pico da FFT), sem o gate de confiança
+    vetor, notas_vetor = medir(lambda y, sr: find_notes(y, sr, metodo='fft', confianca_min=0), y, sr, repeticoes)
+    click.echo(f'laço:       {laco * 1000:9.1f} ms ({len(notas_laco)} notas)')
+    click.echo(f'vetorizado: {vetor * 1000:9.1f} ms ({len(notas_vetor)} notas)')
+    click.echo(f'ganho:      {laco / vetor:9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import random
+import time
+import click
+import cv2
+import numpy as np
+from compositing import overlay_image, overlay_images
+
+
+def overlay_image_mascara(background, overlay, x, y):
+    """overlay_image como era no boleto.py: alfa tratado como máscara binária, sem recorte."""
+    if overlay.shape[2] == 4:
+        overlay_img = overlay[:, :, :3]
+        overlay_mask = overlay[:, :, 3:]
+        bg_region = background[y:y+overlay_img.shape[0], x:x+overlay_img.shape[1]]
+        mask_inv = cv2.bitwise_not(overlay_mask)
+        bg_region = cv2.bitwise_and(bg_region, bg_region, mask=mask_inv)
+        overlay_img = cv2.bitwise_and(overlay_img, overlay_img, mask=overlay_mask)
+        background[y:y+overlay_img.shape[0], x:x+overlay_img.shape[1]] = cv2.add(bg_region, overlay_img)
+    else:
+        background[y:y+overlay.shape[0], x:x+overlay.shape[1]] = overlay
+    return background
+
+
+def gerar_overlays(n, largura, altura, rng):
+    """n imagens BGRA com alfa variado, em caixas do tamanho de pessoas, dentro do quadro."""
+    escala = altura / 480
+    overlays = []
+    for _ in range(n):
+        w = int(rng.randint(20, 80) * escala)
+        h = int(rng.randint(40, 160) * escala)
+        img = np.empty((h, w, 4), dtype=np.uint8)
+        img[:, :, :3] = rng.randint(0, 255)
+        img[:, :, 3] = np.linspace(0, 255, w, dtype=np.uint8)  # Degradê de transparência
+        overlays.append((img, rng.randint(0, largura - w), rng.randint(0, altura - h)))
+    return overlays
+
+
+def referencia(background, overlay, x, y):
+    """Mistura alfa em ponto flutuante, para conferir o resultado inteiro."""
+    h, w = overlay.shape[:2]
+    a = overlay[:, :, 3:] / 255.0
+    regiao = background[y:y+h, x:x+w]
+    regiao[...] = np.rint(overlay[:, :, :3] * a + regiao * (1 - a))
+    return background
+
+
+def medir(funcao, quadro, overlays, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao(quadro, overlays)
+    return (time.perf_counter() - inicio) / (repeticoes * len(overlays))
+
+
+def um_a_um(funcao):
+    def compor(quadro, overlays):
+        for img, x, y in overlays:
+            funcao(quadro, img, x, y)
+    return compor
+
+
+@click.command()
+@click.option("--caixas", default=20, help="Overlays por quadro.")
+@click.option("--repeticoes", default=50, help="Quadros compostos por medição.")
+@click.option("--seed", default=0, help="Semente do gerador de overlays.")
+def main(caixas, repeticoes, seed):
+    """Custo por caixa do overlay com máscara (cv2) e da mistura alfa em NumPy."""
+    click.echo(f"{'quadro':>10} {'máscara (µs)':>13} {'alfa (µs)':>10} {'lote (µs)':>10} {'erro máx':>9}")
+    for largura, altura in ((480, 480), (1920, 1080)):
+        overlays = gerar_overlays(caixas, largura, altura, random.Random(seed))
+        quadro = np.zeros((altura, largura, 3), dtype=np.uint8)
+
+        mascara = medir(um_a_um(overlay_image_mascara), quadro, overlays, repeticoes) * 1e6
+        alfa = medir(um_a_um(overlay_image), quadro, overlays, repeticoes) * 1e6
+        lote = medir(overlay_images, quadro, overlays, repeticoes) * 1e6
+
+        esperado = np.full_like(quadro, 40)
+        obtido = esperado.copy()
+        um_a_um(referencia)(esperado, overlays)
+        overlay_images(obtido, overlays)
+        erro = int(np.abs(esperado.astype(int) - obtido).max())
+
+        click.echo(f"{largura}x{altura:<5} {mascara:>13.1f} {alfa:>10.1f} {lote:>10.1f} {erro:>9}")
+
+
+if __name__ == "__main__":
+    main()
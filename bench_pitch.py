@@ -0,0 +1,87 @@
+import time
+import click
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from pitch import C0, ESTIMADORES, estimate, frequencies_to_notes
+
+SR = 22050
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+
+# Timbres sintéticos: amplitude de cada harmônico (1ª posição = fundamental)
+TIMBRES = {
+    'senoide': [1.0],
+    'dente-de-serra': [1 / h for h in range(1, 9)],
+    'fundamental-fraca': [0.3, 1.0, 0.8, 0.5, 0.3],  # Harmônicos mais fortes que a fundamental
+}
+
+
+def tone_set(notas, segundos, ruido, seed=0):
+    """Um tom por nota MIDI e timbre, com ruído branco (``ruido`` = desvio relativo ao RMS do tom).
+
+    Retorna [(timbre, midi, frequência, sinal)], tudo gerado aqui, sem áudio externo.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(segundos * SR)) / SR
+    tons = []
+    for timbre, amplitudes in TIMBRES.items():
+        for midi in notas:
+            f0 = 440 * 2 ** ((midi - 69) / 12)
+            y = np.zeros_like(t)
+            for h, a in enumerate(amplitudes, 1):
+                if f0 * h < SR / 2:
+                    y += a * np.sin(2 * np.pi * f0 * h * t + rng.uniform(0, 2 * np.pi))
+            y /= np.abs(y).max()
+            y += rng.normal(0, ruido * np.sqrt(np.mean(y * y)), len(y))
+            tons.append((timbre, midi, f0, y.astype(np.float32)))
+    return tons
+
+
+def avaliar(metodo, tons, repeticoes):
+    """Acertos de nota, erro mediano em cents, confiança média e quadros por segundo."""
+    acertos = quadros = 0
+    cents, confiancas = [], []
+    tempo = 0.0
+    for _, _, f0, y in tons:
+        frames = sliding_window_view(y, FRAME_LENGTH)[::HOP_LENGTH]
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            freqs, confianca = estimate(frames, SR, metodo)
+        tempo += (time.perf_counter() - inicio) / repeticoes
+        esperada = frequencies_to_notes([f0])[0]
+        acertos += sum(nota == esperada for nota in frequencies_to_notes(freqs))
+        quadros += len(frames)
+        cents.append(np.abs(1200 * np.log2(freqs / f0)))
+        confiancas.append(confianca)
+    return acertos / quadros, np.median(np.concatenate(cents)), np.mean(np.concatenate(confiancas)), quadros / tempo
+
+
+def confianca_ruido(metodo, segundos, seed=0):
+    """Confiança média sobre ruído branco puro: quanto menor, melhor o gate separa silêncio de nota."""
+    y = np.random.default_rng(seed).normal(0, 0.1, int(segundos * SR)).astype(np.float32)
+    frames = sliding_window_view(y, FRAME_LENGTH)[::HOP_LENGTH]
+    return np.mean(estimate(frames, SR, metodo)[1])
+
+
+@click.command()
+@click.option('--midi-min', default=33, show_default=True, help='Nota MIDI mais grave (33 = A1).')
+@click.option('--midi-max', default=96, show_default=True, help='Nota MIDI mais aguda (96 = C7).')
+@click.option('--segundos', default=0.5, show_default=True, help='Duração de cada tom.')
+@click.option('--ruido', default=0.1, show_default=True, help='Ruído branco relativo ao RMS do tom.')
+@click.option('--repeticoes', default=3, show_default=True, help='Execuções por medição.')
+def main(midi_min, midi_max, segundos, ruido, repeticoes):
+    """Compara os estimadores de pitch.py em tons sintéticos: acerto de nota e velocidade."""
+    notas = range(midi_min, midi_max + 1)
+    click.echo(f'{len(notas)} notas x {len(TIMBRES)} timbres, {segundos} s cada, ruído {ruido} '
+               f'(C0 = {C0:.2f} Hz, quadro {FRAME_LENGTH}, hop {HOP_LENGTH})')
+    click.echo(f'{"estimador":10} {"timbre":18} {"acerto":>7} {"cents":>6} {"conf.":>6} {"quadros/s":>10}')
+    for metodo in ESTIMADORES:
+        for timbre in TIMBRES:
+            tons = [t for t in tone_set(notas, segundos, ruido) if t[0] == timbre]
+            acerto, cents, confianca, velocidade = avaliar(metodo, tons, repeticoes)
+            click.echo(f'{metodo:10} {timbre:18} {acerto:7.1%} {cents:6.1f} {confianca:6.2f} {velocidade:10.0f}')
+        click.echo(f'{metodo:10} {"ruído puro":18} {"":7} {"":6} {confianca_ruido(metodo, segundos * 10):6.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import mmap
+import os
+import time
+import click
+import numpy as np
+from PIL import Image
+from boleto_manifest import list_boletos
+from raw_assets import atualizado, load_raw, raw_path, write_raw
+
+
+def esfriar(caminho):
+    """Tira o arquivo do cache de páginas do sistema, para medir a carga a frio."""
+    fd = os.open(caminho, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def carregar_png(caminho):
+    with Image.open(caminho) as img:
+        return np.asarray(img.convert("RGBA"))
+
+
+def carregar_raw(caminho):
+    pixels, _ = load_raw(caminho)
+    return pixels
+
+
+def medir(funcao, caminhos, arquivos, frio, tocar):
+    """ms por boleto para carregar (e, com ``tocar``, ler todos os pixels)."""
+    if frio:
+        for arquivo in arquivos:
+            esfriar(arquivo)
+    inicio = time.perf_counter()
+    for caminho in caminhos:
+        pixels = funcao(caminho)
+        if tocar:
+            pixels.reshape(-1)[::mmap.PAGESIZE].max()  # Um byte por página: lê o arquivo todo
+    return (time.perf_counter() - inicio) / len(caminhos) * 1000
+
+
+@click.command()
+@click.argument("pasta", default="images_png", type=click.Path(exists=True, file_okay=False))
+@click.option("--limite", default=50, help="Quantidade máxima de boletos medidos.")
+def main(pasta, limite):
+    """Compara a carga de PNG e de RGBA cru com mmap, a frio e a quente."""
+    caminhos = list_boletos(pasta)[:limite]
+    for caminho in caminhos:
+        if not atualizado(caminho):
+            write_raw(caminho)
+    raws = [raw_path(c) for c in caminhos]
+    mb_png = sum(os.path.getsize(c) for c in caminhos) / 1024 / 1024
+    mb_raw = sum(os.path.getsize(r) for r in raws) / 1024 / 1024
+    click.echo(f"{len(caminhos)} boletos: PNG {mb_png:.1f} MB, cru {mb_raw:.1f} MB")
+
+    click.echo(f"{'formato':>18} {'frio (ms)':>10} {'quente (ms)':>12}")
+    for nome, funcao, arquivos, tocar in (
+        ("PNG", carregar_png, caminhos, False),
+        ("cru (só mmap)", carregar_raw, raws, False),
+        ("cru (lendo tudo)", carregar_raw, raws, True),
+    ):
+        frio = medir(funcao, caminhos, arquivos, True, tocar)
+        quente = medir(funcao, caminhos, arquivos, False, tocar)
+        click.echo(f"{nome:>18} {frio:>10.2f} {quente:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import random
+import time
+import click
+import pygame
+from spatial_index import RectIndex
+
+
+def gerar_caixas(n, largura=480, altura=480, rng=random):
+    """Gera n caixas sintéticas (x, y, w, h) do tamanho de pessoas na câmera."""
+    caixas = []
+    for _ in range(n):
+        w = rng.randint(20, 80)
+        h = rng.randint(40, 160)
+        caixas.append((rng.randint(0, largura - w), rng.randint(0, altura - h), w, h))
+    return caixas
+
+
+def mover(caixas, rng=random):
+    """Desloca um pouco cada caixa, como de um quadro para o outro."""
+    return [(x + rng.randint(-5, 5), y + rng.randint(-5, 5), w, h) for x, y, w, h in caixas]
+
+
+def associar_linear(sprites, caixas):
+    """Associação e expiração como era no on_monitor: busca linear, duas vezes."""
+    for caixa in caixas:
+        sprite = next((s for s in sprites if s.colliderect(caixa)), None)
+        if sprite is None:
+            sprites.append(pygame.Rect(caixa))
+        else:
+            sprite.update(caixa)
+    return [s for s in sprites if any(s.colliderect(c) for c in caixas)]
+
+
+def associar_indice(sprites, caixas):
+    """Mesma associação e expiração usando RectIndex."""
+    sprite_index = RectIndex((s, s) for s in sprites)
+    box_index = RectIndex()
+    for caixa in caixas:
+        box_index.insert(caixa)
+        sprite = sprite_index.first(caixa)
+        if sprite is None:
+            sprite = pygame.Rect(caixa)
+            sprites.append(sprite)
+            sprite_index.insert(sprite, sprite)
+        else:
+            sprite.update(caixa)
+    return [s for s in sprites if box_index.any(s)]
+
+
+def medir(funcao, fluxo):
+    sprites = []
+    inicio = time.perf_counter()
+    for caixas in fluxo:
+        sprites = funcao(sprites, caixas)
+    return (time.perf_counter() - inicio) / len(fluxo)
+
+
+@click.command()
+@click.option("--quadros", default=100, help="Quadros por tamanho de fluxo.")
+@click.option("--seed", default=0, help="Semente do gerador de caixas.")
+def main(quadros, seed):
+    """Compara a associação linear com o RectIndex em fluxos de 1 a 200 caixas."""
+    click.echo(f"{'caixas':>7} {'linear (ms)':>12} {'índice (ms)':>12} {'ganho':>6}")
+    for n in (1, 5, 10, 25, 50, 100, 200):
+        rng = random.Random(seed)
+        caixas = gerar_caixas(n, largura=1920, altura=1080, rng=rng)
+        fluxo = []
+        for _ in range(quadros):
+            caixas = mover(caixas, rng)
+            fluxo.append(caixas)
+
+        linear = medir(associar_linear, fluxo) * 1000
+        indice = medir(associar_indice, fluxo) * 1000
+        click.echo(f"{n:>7} {linear:>12.3f} {indice:>12.3f} {linear / indice:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,3 @@
-import os
-import ctypes
-import subprocess
-import re
 import random
 import cv2
 import base64
@@ -10,10 +6,21 @@ import serial
 import threading
 import time
 import logging
+import queue
 import signal
+import click
 from sscma.micro.client import Client
 from sscma.micro.device import Device
 from sscma.micro.const import *
+from boleto_atlas import Atlas
+from boleto_manifest import Manifest, list_boletos
+from compositing import overlay_images
+from display_resolution import get_screen_resolution
+from frame_display import FrameDisplay
+from frame_mailbox import FrameMailbox
+from resize_cache import ResizeCache
+from serial_ingest import ImageStripper, SerialReader
+from tracker import iou
 
 logging.basicConfig(level=logging.DEBUG)
 _LOGGER = logging.getLogger(__name__)
@@ -27,76 +34,44 @@ JSON_WIDTH = 480
 JSON_HEIGHT = 480
 
 recieve_thread_running = True
+serial_reader = None  # Leitor da serial, parado pelo signal_handler
+
+# Último conjunto de caixas recebido: a renderização sempre usa o mais novo
+frame_mailbox = FrameMailbox()
+
+# Quadros compostos esperando a exibição, que roda no laço principal
+DISPLAY_QUEUE_SIZE = 1
+display_queue = queue.Queue(maxsize=DISPLAY_QUEUE_SIZE)
+
+# Boletos redimensionados por tamanho de caixa, e o boleto de cada caixa do quadro anterior
+resize_cache = ResizeCache()
+box_images = []  # [((x, y, w, h), caminho)]
+
+# Resolução da tela e quadros pré-alocados, definidos em setup_display (não no import)
+DISPLAY_WIDTH, DISPLAY_HEIGHT = None, None
+frame_buffers = []
+frame_index = 0
+
+def setup_display(resolution=None, redetectar=False):
+    """Descobre a resolução (ou usa 'resolution', ex.: '1920x1080') e aloca os quadros."""
+    global DISPLAY_WIDTH, DISPLAY_HEIGHT, frame_buffers
+    DISPLAY_WIDTH, DISPLAY_HEIGHT = get_screen_resolution(resolution, atualizar=redetectar)
+
+    # Quadros que se alternam, em vez de alocar um novo a cada mensagem: um sendo
+    # mostrado, os da fila de exibição e um sendo composto
+    frame_buffers = [np.zeros((DISPLAY_HEIGHT, DISPLAY_WIDTH, 3), dtype=np.uint8)
+                     for _ in range(DISPLAY_QUEUE_SIZE + 2)]
 
-def get_screen_resolution():
-    # Inicializa largura e altura como None
-    width, height = None, None
-
-    if os.name == 'nt':  # Windows
-        user32 = ctypes.windll.user32
-        width = user32.GetSystemMetrics(0)  # Largura da tela
-        height = user32.GetSystemMetrics(1)  # Altura da tela
-
-    elif os.name == 'posix':  # Linux ou MacOS
-        # Tenta usar `xdpyinfo`
-        try:
-            output = subprocess.run(['xdpyinfo'], capture_output=True, text=True, check=True)
-            resolution = re.search(r'dimensions:\s+(\d+)x(\d+)', output.stdout)
-            if resolution:
-                width = int(resolution.group(1))
-                height = int(resolution.group(2))
-        except Exception as e:
-            print(f"Erro ao usar 'xdpyinfo': {e}. Tentando xrandr...")
-            # Tenta usar `xrandr`
-            try:
-                output = subprocess.run(['xrandr'], capture_output=True, text=True, check=True)
-                for line in output.stdout.splitlines():
-                    if '*' in line:
-                        parts = line.split()
-                        width = int(parts[0])  # Largura
-                        height = int(parts[2])  # Altura
-                        break
-            except Exception as e:
-                print(f"Erro ao executar 'xrandr': {e}. Tentando acessar arquivos de sistema...")
-
-                # Tenta acessar /sys/class/drm/ para obter a resolução
-                try:
-                    for filename in os.listdir('/sys/class/drm/'):
-                        if 'card' in filename:
-                            mode_file = os.path.join('/sys/class/drm/', filename, 'modes')
-                            with open(mode_file) as f:
-                                for line in f:
-                                    parts = line.split()
-                                    if parts:
-                                        resolution = parts[0]  # A primeira linha geralmente tem a resolução
-                                        width, height = map(int, resolution.split('x'))
-                                        return width, height
-                except Exception as e:
-                    print(f"Erro ao acessar arquivos de sistema: {e}")
-
-    if width is not None and height is not None:
-        return width, height
-    else:
-        raise Exception("Não foi possível obter a resolução da tela.")
-
-DISPLAY_WIDTH, DISPLAY_HEIGHT = get_screen_resolution()
-
-
-def recieve_thread(serial_port, client):
-    while recieve_thread_running:
-        if serial_port.in_waiting:
-            msg = serial_port.read(serial_port.in_waiting)
-            if msg != b'':
-                client.on_recieve(msg)
 
 def load_images():
-    """Carrega as imagens da pasta e as embaralha."""
+    """Carrega a lista de imagens (do manifesto, se houver) e as embaralha."""
     global images_list
-    images_list = os.listdir(IMAGES_PATH)
+    images_list = list_boletos(IMAGES_PATH)
+    resize_cache.atlas = Atlas.load(IMAGES_PATH, Manifest.load(IMAGES_PATH))
     random.shuffle(images_list)  # Embaralha as imagens no início
 
-def get_next_image():
-    """Obtém a próxima imagem da lista, reembaralhando se necessário."""
+def get_next_image_path():
+    """Obtém o caminho da próxima imagem da lista, reembaralhando se necessário."""
     global current_image_index
 
     if current_image_index >= len(images_list):
@@ -104,12 +79,35 @@ def get_next_image():
         random.shuffle(images_list)
         current_image_index = 0
 
-    img_path = os.path.join(IMAGES_PATH, images_list[current_image_index])
+    img_path = images_list[current_image_index]
     current_image_index += 1
+    return img_path
 
-    # Carregar a imagem
-    img = cv2.imread(img_path, cv2.IMREAD_UNCHANGED)  # Ler com o canal alfa (transparência, se houver)
-    return img
+def get_next_image():
+    """Obtém a próxima imagem da lista, com o canal alfa (transparência, se houver)."""
+    return resize_cache.original(get_next_image_path())
+
+def assign_images(rects):
+    """Escolhe o boleto de cada caixa (x, y, w, h).
+
+    Uma caixa que se sobrepõe a uma do quadro anterior herda o boleto dela, então
+    uma pessoa parada mantém a mesma imagem (e a mesma versão redimensionada).
+    """
+    global box_images
+    anteriores = list(box_images)
+    caminhos = []
+    for rect in rects:
+        melhor, melhor_iou = None, 0.3
+        for i, (anterior, _) in enumerate(anteriores):
+            valor = iou(rect, anterior)
+            if valor >= melhor_iou:
+                melhor, melhor_iou = i, valor
+        if melhor is None:
+            caminhos.append(get_next_image_path())
+        else:
+            caminhos.append(anteriores.pop(melhor)[1])
+    box_images = list(zip(rects, caminhos))
+    return caminhos
 
 def resize_bounding_boxes(boxes, img_width, img_height):
     resized_boxes = []
@@ -124,57 +122,61 @@ def resize_bounding_boxes(boxes, img_width, img_height):
         resized_boxes.append([x_min, y_min, x_max, y_max, confidence, class_id])
     return resized_boxes
 
-def overlay_image(background, overlay, x, y):
-    """Sobrepõe a imagem 'overlay' em 'background' nas coordenadas (x, y)."""
-    if overlay.shape[2] == 4:  # Se a imagem de sobreposição tiver canal alfa (transparência)
-        overlay_img = overlay[:, :, :3]
-        overlay_mask = overlay[:, :, 3:]
-        bg_region = background[y:y+overlay_img.shape[0], x:x+overlay_img.shape[1]]
-        mask_inv = cv2.bitwise_not(overlay_mask)
-        bg_region = cv2.bitwise_and(bg_region, bg_region, mask=mask_inv)
-        overlay_img = cv2.bitwise_and(overlay_img, overlay_img, mask=overlay_mask)
-        background[y:y+overlay_img.shape[0], x:x+overlay_img.shape[1]] = cv2.add(bg_region, overlay_img)
-    else:
-        background[y:y+overlay.shape[0], x:x+overlay.shape[1]] = overlay
-    return background
-
 def draw_bounding_boxes(img, boxes):
     for box in boxes:
         x_min, y_min, x_max, y_max, _, _ = box  # Ignoramos confidence e class_id
         # Desenha as bounding boxes na imagem sem texto
         cv2.rectangle(img, (x_min, y_min), (x_max, y_max), (0, 255, 0), 2)
 
-def monitor_handler(device, msg):
-    if "boxes" in msg:
-        boxes = msg["boxes"]
-        
-        # Criar uma imagem em branco (preta) para a exibição
-        img = np.zeros((DISPLAY_HEIGHT, DISPLAY_WIDTH, 3), dtype=np.uint8)
-        
-        # Redimensiona as bounding boxes de acordo com a resolução
-        resized_boxes = resize_bounding_boxes(boxes, DISPLAY_WIDTH, DISPLAY_HEIGHT)
-
-        for box in resized_boxes:
-            x_min, y_min, x_max, y_max, _, _ = box
-
-            # Obtenha a próxima imagem aleatória da pasta
-            overlay_img = get_next_image()
-
-            # Redimensionar a imagem para caber na bounding box
-            overlay_img_resized = cv2.resize(overlay_img, (x_max - x_min, y_max - y_min))
+def render_boxes(boxes):
+    # Reaproveitar o próximo quadro pré-alocado, limpando para preto
+    global frame_index
+    frame_index = (frame_index + 1) % len(frame_buffers)
+    img = frame_buffers[frame_index]
+    img.fill(0)
+
+    # Redimensiona as bounding boxes de acordo com a resolução
+    resized_boxes = resize_bounding_boxes(boxes, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    rects = [(x_min, y_min, x_max - x_min, y_max - y_min)
+             for x_min, y_min, x_max, y_max, _, _ in resized_boxes
+             if x_max > x_min and y_max > y_min]  # Caixas degeneradas: nada para desenhar
+
+    overlays = []
+    for (x, y, w, h), img_path in zip(rects, assign_images(rects)):
+        # Versão do boleto no tamanho da caixa (redimensiona só quando o tamanho muda)
+        overlays.append((resize_cache.get(img_path, w, h), x, y))
+
+    # Sobrepor todas as imagens de uma vez (com alfa e recorte nas bordas)
+    overlay_images(img, overlays)
+    return img
 
-            # Sobrepor a imagem na posição da bounding box
-            img = overlay_image(img, overlay_img_resized, x_min, y_min)
+def render_thread():
+    """Compõe sempre o quadro mais novo, descartando os que chegaram no meio tempo."""
+    while recieve_thread_running:
+        boxes = frame_mailbox.get(timeout=0.1)
+        if boxes is None:
+            continue
+        img = render_boxes(boxes)
+
+        # Fila cheia: esperar a exibição, enquanto a mailbox segura só as caixas mais novas.
+        # Não pode descartar o quadro da fila: o buffer dele seria reescrito em uso.
+        while recieve_thread_running:
+            try:
+                display_queue.put(img, timeout=0.1)
+                break
+            except queue.Full:
+                pass
 
-        # Exibir a imagem final com as imagens sobrepostas
-        cv2.imshow('Detecções com Imagens', img)
-        cv2.waitKey(1)
+def monitor_handler(device, msg):
+    # Só entregar as caixas: a renderização acontece na render_thread
+    if "boxes" in msg:
+        frame_mailbox.put(msg["boxes"])
 
     print(msg)
 
 def on_device_connect(device):
     print("device connected")
-    device.Invoke(-1, False, True)
+    device.Invoke(-1, False, False)  # Sem imagens: só as caixas são usadas
     device.tscore = 70
     device.tiou = 70
 
@@ -182,38 +184,73 @@ def signal_handler(signal, frame):
     print("Ctrl+C pressed!")
     global recieve_thread_running
     recieve_thread_running = False
+    if serial_reader is not None:
+        serial_reader.stop()
     exit(0)
 
-def main():
+@click.command()
+@click.option("--fps-max", type=float, default=None, help="Limite de quadros exibidos por segundo.")
+@click.option("--headless", is_flag=True, help="Não abre janela: os quadros são descartados.")
+@click.option("--video", type=click.Path(dir_okay=False), default=None,
+              help="Grava os quadros neste arquivo de vídeo em vez de abrir janela.")
+@click.option("--resolution", default=None,
+              help="Resolução LARGURAxALTURA, em vez de detectar (ou BORBOLETO_RESOLUTION).")
+@click.option("--redetectar", is_flag=True,
+              help="Ignora a resolução guardada em cache e detecta de novo (ou BORBOLETO_REDETECTAR=1).")
+def main(fps_max, headless, video, resolution, redetectar):
     signal.signal(signal.SIGINT, signal_handler)
+    setup_display(resolution, redetectar)
     serial_port = serial.Serial("COM11", 921600, timeout=0.1)
     #serial_port = serial.Serial("/dev/ttyACM0", 921600, timeout=0.1)
     client = Client(lambda msg: serial_port.write(msg))
-    threading.Thread(target=recieve_thread, args=(serial_port, client)).start()
+
+    # Leitura bloqueante: a thread dorme enquanto não chegam dados
+    global serial_reader
+    # Se o dispositivo ainda mandar a imagem, ela é cortada antes do parse JSON
+    stripper = ImageStripper(client.on_recieve)
+    serial_reader = SerialReader(serial_port, stripper.feed)
+    serial_reader.start()
+
+    # Carrega as imagens da pasta no início do programa
+    load_images()
+    threading.Thread(target=render_thread, daemon=True).start()
 
     device = Device(client)
     device.on_monitor = monitor_handler
     device.on_connect = on_device_connect
     device.loop_start()
 
-    # Carrega as imagens da pasta no início do programa
-    load_images()
-
     print(device.info)
 
+    # O laço principal exibe os quadros: imshow/waitKey não bloqueiam a serial
+    display = FrameDisplay('Detecções com Imagens', fps_max=fps_max, headless=headless, video=video)
     i = 60
-    while True:
-        #print(device.wifi)
-        #print(device.mqtt)
-        #print(device.info)
-        #print(device.model)
-        device.tscore = i
-        device.tiou = i
-        i = i + 1
-        if i > 100:
-            i = 30
-
-        time.sleep(2)
+    ultimo_ajuste = time.monotonic()
+    try:
+        while recieve_thread_running:
+            try:
+                display.show(display_queue.get(timeout=0.05))
+            except queue.Empty:
+                display.poll()
+
+            if time.monotonic() - ultimo_ajuste < 2:
+                continue
+            ultimo_ajuste = time.monotonic()
+
+            #print(device.wifi)
+            #print(device.mqtt)
+            #print(device.info)
+            #print(device.model)
+            device.tscore = i
+            device.tiou = i
+            i = i + 1
+            if i > 100:
+                i = 30
+
+            print(f"Quadros: {frame_mailbox.stats()} Exibidos: {display.stats()} "
+                  f"Redimensionamentos: {resize_cache.stats()}")
+    finally:
+        display.close()  # Fecha o arquivo de vídeo mesmo saindo pelo Ctrl+C
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,154 @@
+import json
+import os
+import click
+import numpy as np
+from PIL import Image
+from boleto_manifest import Manifest, list_boletos
+
+ATLAS_INDEX = "atlas.json"  # Índice do atlas dentro da pasta dos boletos
+VERSAO = 1
+MAX_MB_PADRAO = 1024  # Tamanho máximo de cada arquivo do atlas (mmap em sistemas 32 bits)
+ALINHAMENTO = 64  # Cada sprite começa num múltiplo de 64 bytes
+
+
+class Atlas:
+    """Boletos em RGBA cru, empacotados em poucos arquivos e lidos com ``mmap``.
+
+    Cada sprite ocupa um trecho contíguo de um arquivo ``atlas_N.rgba``; o índice
+    (``atlas.json``) guarda arquivo, offset e dimensões. Ler um sprite não abre nem
+    decodifica nenhum PNG: ``array``, ``image`` e ``surface`` são vistas sobre as
+    páginas mapeadas, compartilhadas entre processos pelo cache do sistema.
+    """
+
+    def __init__(self, pasta, indice):
+        self.pasta = pasta
+        self.arquivos = indice["arquivos"]
+        self.sprites = indice["sprites"]  # nome -> {arquivo, offset, largura, altura, sha256}
+        self._mapas = {}
+
+    @classmethod
+    def load(cls, pasta, manifest=None):
+        """Abre o atlas da pasta, ou None se não houver.
+
+        Com ``manifest``, sprites cujo PNG mudou depois do atlas (hash diferente) são
+        ignorados, e quem carrega volta a ler o PNG.
+        """
+        try:
+            with open(os.path.join(pasta, ATLAS_INDEX)) as f:
+                indice = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if indice.get("versao") != VERSAO:
+            return None
+        atlas = cls(pasta, indice)
+        if manifest is not None:
+            atlas.sprites = {nome: s for nome, s in atlas.sprites.items()
+                             if manifest.entradas.get(nome, {}).get("sha256", s["sha256"]) == s["sha256"]}
+        return atlas
+
+    @staticmethod
+    def _nome(caminho):
+        return os.path.basename(caminho)
+
+    def __contains__(self, caminho):
+        return self._nome(caminho) in self.sprites
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def _mapa(self, arquivo):
+        mapa = self._mapas.get(arquivo)
+        if mapa is None:
+            mapa = np.memmap(os.path.join(self.pasta, self.arquivos[arquivo]), dtype=np.uint8, mode="r")
+            self._mapas[arquivo] = mapa
+        return mapa
+
+    def _bytes(self, caminho):
+        s = self.sprites[self._nome(caminho)]
+        tamanho = s["largura"] * s["altura"] * 4
+        return self._mapa(s["arquivo"])[s["offset"]:s["offset"] + tamanho], (s["largura"], s["altura"])
+
+    def size(self, caminho):
+        s = self.sprites[self._nome(caminho)]
+        return s["largura"], s["altura"]
+
+    def array(self, caminho):
+        """Vista (altura, largura, 4) RGBA somente leitura, sem cópia."""
+        dados, (largura, altura) = self._bytes(caminho)
+        return dados.reshape(altura, largura, 4)
+
+    def image(self, caminho):
+        """``PIL.Image`` RGBA sobre o mmap, sem cópia (somente leitura)."""
+        dados, tamanho = self._bytes(caminho)
+        return Image.frombuffer("RGBA", tamanho, dados, "raw", "RGBA", 0, 1)
+
+    def surface(self, caminho):
+        """``pygame.Surface`` sobre o mmap, sem cópia. Não desenhe nela."""
+        import pygame
+        dados, tamanho = self._bytes(caminho)
+        return pygame.image.frombuffer(dados, tamanho, "RGBA")
+
+
+def build_atlas(pasta, max_mb=MAX_MB_PADRAO):
+    """Empacota os boletos da pasta (os do manifesto, se houver) no atlas. Retorna o índice."""
+    manifest = Manifest.load(pasta)
+    max_bytes = max_mb * 1024 * 1024
+    arquivos, sprites = [], {}
+    saida, usado = None, 0
+
+    try:
+        for caminho in list_boletos(pasta):
+            with Image.open(caminho) as img:
+                dados = img.convert("RGBA").tobytes()
+                largura, altura = img.size
+
+            # Novo arquivo quando o atual encheria além do limite
+            if saida is None or (usado and usado + len(dados) > max_bytes):
+                if saida is not None:
+                    saida.close()
+                arquivos.append(f"atlas_{len(arquivos)}.rgba")
+                saida = open(os.path.join(pasta, arquivos[-1] + ".tmp"), "wb")
+                usado = 0
+
+            nome = os.path.basename(caminho)
+            entrada = manifest.entradas.get(nome)
+            sprites[nome] = {
+                "arquivo": len(arquivos) - 1,
+                "offset": usado,
+                "largura": largura,
+                "altura": altura,
+                "sha256": entrada["sha256"] if entrada else None,
+            }
+            saida.write(dados)
+            usado += len(dados)
+            padding = -usado % ALINHAMENTO
+            saida.write(b"\0" * padding)
+            usado += padding
+    finally:
+        if saida is not None:
+            saida.close()
+
+    # Os arquivos e o índice só substituem os anteriores no fim: um build
+    # interrompido não deixa um atlas pela metade em uso
+    for arquivo in arquivos:
+        os.replace(os.path.join(pasta, arquivo + ".tmp"), os.path.join(pasta, arquivo))
+    indice = {"versao": VERSAO, "formato": "RGBA", "arquivos": arquivos, "sprites": sprites}
+    temporario = os.path.join(pasta, ATLAS_INDEX + ".tmp")
+    with open(temporario, "w") as f:
+        json.dump(indice, f)
+    os.replace(temporario, os.path.join(pasta, ATLAS_INDEX))
+    return indice
+
+
+@click.command()
+@click.argument("pasta", default="images_png", type=click.Path(exists=True, file_okay=False))
+@click.option("--max-mb", default=MAX_MB_PADRAO, show_default=True, help="Tamanho máximo de cada arquivo do atlas.")
+def main(pasta, max_mb):
+    """Empacota os PNGs da PASTA num atlas RGBA para carregar com mmap."""
+    indice = build_atlas(pasta, max_mb)
+    total = sum(os.path.getsize(os.path.join(pasta, a)) for a in indice["arquivos"])
+    click.echo(f"{len(indice['sprites'])} boletos em {len(indice['arquivos'])} arquivo(s), {total / 1024 / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
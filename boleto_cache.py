@@ -0,0 +1,93 @@
+import os
+import random
+import threading
+from collections import OrderedDict
+from PIL import Image
+from boleto_atlas import Atlas
+from boleto_manifest import Manifest
+from raw_assets import load_image
+
+MEMORIA_PADRAO = 256 * 1024 * 1024  # Orçamento padrão de memória (256 MB)
+
+
+class BoletoCache:
+    """Guarda os boletos já decodificados em RGBA, com limite de memória e descarte LRU."""
+
+    def __init__(self, pasta_imagens, memoria_max=MEMORIA_PADRAO, altura_max=None, preload=True):
+        self.pasta_imagens = pasta_imagens
+        # Com manifesto, a lista e as dimensões vêm dele, sem listar a pasta nem abrir os PNGs
+        manifest = Manifest.load(pasta_imagens)
+        if manifest.entradas:
+            self.caminhos = manifest.boletos()
+        else:
+            self.caminhos = sorted(os.path.join(pasta_imagens, img) for img in os.listdir(pasta_imagens) if img.endswith('.png'))
+        self.atlas = Atlas.load(pasta_imagens, manifest)  # Sprites em RGBA cru, sem decodificar PNG
+        self.memoria_max = memoria_max  # Limite em bytes para os pixels decodificados
+        self.altura_max = altura_max  # Reduz boletos maiores que a tela já na carga
+        self.memoria_usada = 0
+        self.hits = 0
+        self.misses = 0
+        self._imagens = OrderedDict()  # caminho -> Image RGBA, na ordem de uso
+        self._lock = threading.Lock()
+
+        if preload:
+            self.preload()
+
+    def __len__(self):
+        return len(self._imagens)
+
+    @staticmethod
+    def _tamanho(imagem):
+        """Bytes ocupados pelos pixels RGBA da imagem."""
+        return imagem.width * imagem.height * 4
+
+    def _decode(self, caminho):
+        """Abre o PNG uma única vez e o converte para uma forma RGBA compacta."""
+        if self.atlas is not None and caminho in self.atlas:
+            imagem = self.atlas.image(caminho)  # Vista sobre o mmap, sem cópia
+        else:
+            imagem = load_image(caminho)  # Arquivo .rgba cru com mmap, ou o PNG
+
+        # Não faz sentido guardar pixels que nunca vão caber na tela
+        if self.altura_max and imagem.height > self.altura_max:
+            largura = max(1, round(imagem.width * self.altura_max / imagem.height))
+            imagem = imagem.resize((largura, self.altura_max), Image.Resampling.LANCZOS)
+        return imagem
+
+    def _evict(self):
+        """Descarta os boletos usados há mais tempo até caber no orçamento."""
+        while self.memoria_usada > self.memoria_max and len(self._imagens) > 1:
+            _, antiga = self._imagens.popitem(last=False)
+            self.memoria_usada -= self._tamanho(antiga)
+
+    def preload(self):
+        """Decodifica os boletos na inicialização até preencher o orçamento de memória."""
+        for caminho in self.caminhos:
+            antes = len(self._imagens)
+            self.get(caminho)  # Já soma o tamanho em memoria_usada (e descarta se passar do orçamento)
+            if self.memoria_usada >= self.memoria_max or len(self._imagens) <= antes:
+                break  # Orçamento cheio: o restante será carregado sob demanda
+
+    def get(self, caminho):
+        """Retorna o boleto decodificado. A imagem é compartilhada: não altere no lugar."""
+        with self._lock:
+            imagem = self._imagens.get(caminho)
+            if imagem is not None:
+                self._imagens.move_to_end(caminho)
+                self.hits += 1
+                return imagem
+            self.misses += 1
+
+        # Decodificar fora do lock para não travar as outras threads
+        imagem = self._decode(caminho)
+
+        with self._lock:
+            if caminho not in self._imagens:
+                self._imagens[caminho] = imagem
+                self.memoria_usada += self._tamanho(imagem)
+                self._evict()
+        return imagem
+
+    def random(self):
+        """Retorna um boleto aleatório da pasta."""
+        return self.get(random.choice(self.caminhos))
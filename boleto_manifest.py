@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+from PIL import Image
+
+MANIFEST = "manifest.json"  # Nome do manifesto dentro da pasta dos boletos
+VERSAO = 1
+
+
+def sha256_arquivo(caminho, bloco=1024 * 1024):
+    """Hash SHA-256 do conteúdo do arquivo."""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for parte in iter(lambda: f.read(bloco), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def chave_parametros(**parametros):
+    """Hash dos parâmetros que definem um boleto: se qualquer um mudar, ele é refeito."""
+    texto = json.dumps(parametros, sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def descrever_png(caminho):
+    """Hash, tamanho em disco e dimensões de um PNG (só o cabeçalho é lido para as dimensões)."""
+    with Image.open(caminho) as img:
+        largura, altura = img.size
+    stat = os.stat(caminho)
+    return {
+        "sha256": sha256_arquivo(caminho),
+        "bytes": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "largura": largura,
+        "altura": altura,
+        "proporcao": largura / altura,
+    }
+
+
+class Manifest:
+    """Manifesto dos boletos gerados: parâmetros, campos, hash e dimensões de cada PNG.
+
+    As entradas são indexadas pelo nome do arquivo, relativo à pasta. O build
+    usa ``pendentes`` para gerar só o que falta ou mudou; os programas de
+    exibição usam ``boletos`` sem listar a pasta.
+    """
+
+    def __init__(self, pasta, entradas=None):
+        self.pasta = pasta
+        self.entradas = entradas if entradas is not None else {}
+
+    @classmethod
+    def load(cls, pasta):
+        """Lê o manifesto da pasta. Sem manifesto (ou ilegível), começa vazio."""
+        try:
+            with open(os.path.join(pasta, MANIFEST)) as f:
+                dados = json.load(f)
+            if dados.get("versao") == VERSAO:
+                return cls(pasta, dados["boletos"])
+        except (OSError, ValueError, KeyError):
+            pass
+        return cls(pasta)
+
+    def save(self):
+        """Grava o manifesto de forma atômica (arquivo temporário + rename)."""
+        caminho = os.path.join(self.pasta, MANIFEST)
+        temporario = caminho + ".tmp"
+        with open(temporario, "w") as f:
+            json.dump({"versao": VERSAO, "boletos": self.entradas}, f, indent=1, sort_keys=True)
+        os.replace(temporario, caminho)
+
+    def caminho(self, arquivo):
+        return os.path.join(self.pasta, arquivo)
+
+    def valido(self, arquivo, chave=None, verificar_hash=False):
+        """Se o PNG existe, corresponde à entrada e (se dada) foi gerado com a mesma chave.
+
+        Tamanho e mtime iguais aos registrados bastam, a não ser com
+        ``verificar_hash``; se diferirem, o hash do conteúdo decide.
+        """
+        entrada = self.entradas.get(arquivo)
+        if entrada is None or (chave is not None and entrada.get("chave") != chave):
+            return False
+        try:
+            stat = os.stat(self.caminho(arquivo))
+        except OSError:
+            return False
+        if not verificar_hash and stat.st_size == entrada["bytes"] and stat.st_mtime_ns == entrada["mtime_ns"]:
+            return True
+        if stat.st_size != entrada["bytes"] or sha256_arquivo(self.caminho(arquivo)) != entrada["sha256"]:
+            return False
+        entrada["mtime_ns"] = stat.st_mtime_ns  # Mesmo conteúdo, só tocado
+        return True
+
+    def pendentes(self, chaves, verificar_hash=False):
+        """Arquivos de ``chaves`` (arquivo -> chave) que faltam ou estão inválidos."""
+        return [arquivo for arquivo, chave in chaves.items()
+                if not self.valido(arquivo, chave, verificar_hash)]
+
+    def registrar(self, arquivo, chave, descricao, **metadados):
+        """Adiciona ou substitui a entrada de um boleto gerado."""
+        self.entradas[arquivo] = dict(metadados, chave=chave, **descricao)
+
+    def boletos(self):
+        """Caminhos dos boletos do manifesto que existem em disco, em ordem."""
+        return [self.caminho(arquivo) for arquivo in sorted(self.entradas)
+                if os.path.exists(self.caminho(arquivo))]
+
+
+def list_boletos(pasta):
+    """Boletos da pasta: os do manifesto, ou os PNGs da pasta quando não há manifesto."""
+    manifest = Manifest.load(pasta)
+    if manifest.entradas:
+        return manifest.boletos()
+    return sorted(os.path.join(pasta, img) for img in os.listdir(pasta) if img.endswith('.png'))
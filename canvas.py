@@ -0,0 +1,51 @@
+import threading
+import pygame
+from sprite_bank import pil_to_surface
+
+
+class Canvas:
+    """Tela acumulada mantida como ``pygame.Surface``, com registro das regiões alteradas.
+
+    Os boletos são colados direto na Surface, então não há conversão
+    PIL → bytes → Surface da tela inteira a cada quadro. ``present`` só copia
+    para a tela e atualiza as regiões coladas desde a última chamada.
+    """
+
+    def __init__(self, size, fundo=(0, 0, 0)):
+        self.fundo = fundo
+        self.surface = pygame.Surface(size)
+        self.surface.fill(fundo)
+        self.lock = threading.Lock()  # fill() e display() rodam em threads diferentes
+        self._sujos = []
+        self._posicao = None  # Posição usada no último present
+
+    def paste(self, imagem, pos):
+        """Cola uma imagem PIL RGBA (respeitando o alfa) na posição ``pos``."""
+        surface = pil_to_surface(imagem)
+        with self.lock:
+            rect = self.surface.blit(surface, pos)
+            if rect.width and rect.height:
+                self._sujos.append(rect)
+
+    def present(self, screen, pos):
+        """Mostra o canvas em ``pos`` na tela, atualizando só o que mudou."""
+        pos = tuple(pos)
+        with self.lock:
+            sujos, self._sujos = self._sujos, []
+            if pos != self._posicao:
+                # Primeiro quadro ou canvas deslocado: redesenhar tudo
+                screen.fill(self.fundo)
+                screen.blit(self.surface, pos)
+                self._posicao = pos
+                atualizar = None
+            else:
+                atualizar = []
+                for rect in sujos:
+                    destino = rect.move(pos)
+                    screen.blit(self.surface, destino, rect)
+                    atualizar.append(destino)
+
+        if atualizar is None:
+            pygame.display.flip()
+        elif atualizar:
+            pygame.display.update(atualizar)
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+def _recorte(background, overlay, x, y):
+    """Regiões correspondentes do fundo e do overlay, recortadas nas bordas do fundo."""
+    h, w = background.shape[:2]
+    oh, ow = overlay.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + ow, w), min(y + oh, h)
+    if x0 >= x1 or y0 >= y1:
+        return None, None  # Totalmente fora do quadro
+    return background[y0:y1, x0:x1], overlay[y0 - y:y1 - y, x0 - x:x1 - x]
+
+
+def _buffers(n):
+    """Buffers uint16 com espaço para n pixels: alfa, 255 - alfa, mistura e temporário."""
+    return np.empty((4, n), dtype=np.uint16)
+
+
+def overlay_image(background, overlay, x, y, buffers=None):
+    """Sobrepõe 'overlay' em 'background' nas coordenadas (x, y), no lugar.
+
+    Com canal alfa faz a mistura real ``cor * a + fundo * (255 - a)`` em inteiros,
+    com divisão por 255 arredondada. A parte do overlay fora do fundo é
+    descartada, então caixas encostadas (ou além) da borda funcionam.
+    """
+    regiao, recorte = _recorte(background, overlay, x, y)
+    if regiao is None:
+        return background
+
+    if recorte.ndim == 3 and recorte.shape[2] == 4:
+        rh, rw = regiao.shape[:2]
+        if buffers is None or buffers.shape[1] < rh * rw:
+            buffers = _buffers(rh * rw)
+        alpha, inverso, mistura, temp = (b[:rh * rw].reshape(rh, rw) for b in buffers)
+
+        # Um canal por vez: o laço interno do NumPy percorre a linha inteira em vez
+        # dos 3-4 bytes de um pixel, o que é bem mais rápido que operar em (h, w, 3)
+        np.copyto(alpha, recorte[:, :, 3])
+        np.subtract(255, alpha, out=inverso)
+        for c in range(3):
+            np.multiply(recorte[:, :, c], alpha, out=mistura)
+            np.multiply(regiao[:, :, c], inverso, out=temp)
+            mistura += temp
+
+            # round(t / 255) exato para t <= 255 * 255: (t + 128 + ((t + 128) >> 8)) >> 8
+            mistura += 128
+            np.right_shift(mistura, 8, out=temp)
+            mistura += temp
+            mistura >>= 8
+            np.copyto(regiao[:, :, c], mistura, casting='unsafe')
+    else:
+        regiao[...] = recorte[:, :, :3]
+    return background
+
+
+def overlay_images(background, overlays):
+    """Sobrepõe vários (overlay, x, y) no mesmo quadro pré-alocado, reaproveitando os buffers."""
+    maior = max((o.shape[0] * o.shape[1] for o, _, _ in overlays), default=0)
+    buffers = _buffers(maior)
+    for overlay, x, y in overlays:
+        overlay_image(background, overlay, x, y, buffers)
+    return background
@@ -0,0 +1,106 @@
+import pygame
+
+
+def merge_rects(rects):
+    """Junta os retângulos que se sobrepõem, para atualizar menos regiões maiores."""
+    juntos = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = rect.collidelist(juntos)
+        while i >= 0:
+            rect.union_ip(juntos.pop(i))
+            i = rect.collidelist(juntos)
+        juntos.append(rect)
+    return juntos
+
+
+class DirtyRenderer:
+    """Redesenha só as regiões da tela onde algum sprite mudou, se moveu ou sumiu.
+
+    Para cada sprite guarda a área ocupada no quadro anterior e uma assinatura
+    (posição + imagens da pilha). Se a assinatura muda, a área antiga e a nova
+    ficam sujas. Cada região suja é limpa e redesenhada com clip, na ordem do
+    grupo, e só essas regiões vão para ``pygame.display.update``.
+    """
+
+    def __init__(self, screen, fundo=(0, 0, 0), margem=4):
+        self.screen = screen
+        self.fundo = fundo
+        self.margem = margem  # Folga para o deslocamento das sombras
+        self._anteriores = {}  # sprite -> (área, assinatura)
+        self._primeiro = True
+        self.quadros = 0
+        self.regioes = 0  # Regiões atualizadas no total
+        self.pixels = 0  # Pixels atualizados no total
+
+    def _area(self, sprite):
+        """Retângulo que cobre tudo que o sprite desenha, ou None se a pilha estiver vazia."""
+        rects = [img.get_rect(center=sprite.rect.center) for img in sprite.images]
+        rects += [shadow.get_rect(center=sprite.rect.center) for shadow in getattr(sprite, "shadows", [])]
+        if not rects:
+            return None
+        return rects[0].unionall(rects[1:]).inflate(self.margem * 2, self.margem * 2)
+
+    @staticmethod
+    def _assinatura(sprite):
+        return tuple(sprite.rect), tuple(id(img) for img in sprite.images)
+
+    def render(self, sprites):
+        """Desenha o quadro e atualiza só as regiões que mudaram."""
+        sprites = list(sprites)
+        atuais = {}
+        sujos = []
+        for sprite in sprites:
+            area = self._area(sprite)
+            assinatura = self._assinatura(sprite)
+            atuais[sprite] = (area, assinatura)
+
+            anterior = self._anteriores.get(sprite)
+            if anterior is None or anterior[1] != assinatura:
+                if anterior is not None and anterior[0] is not None:
+                    sujos.append(anterior[0])
+                if area is not None:
+                    sujos.append(area)
+
+        # Sprites que saíram do grupo deixam a área antiga suja
+        for sprite, (area, _) in self._anteriores.items():
+            if sprite not in atuais and area is not None:
+                sujos.append(area)
+        self._anteriores = atuais
+        self.quadros += 1
+
+        if self._primeiro:
+            self._primeiro = False
+            self.screen.fill(self.fundo)
+            for sprite in sprites:
+                sprite.draw(self.screen)
+            pygame.display.flip()
+            return
+
+        tela = self.screen.get_rect()
+        sujos = [r.clip(tela) for r in merge_rects(sujos)]
+        sujos = [r for r in sujos if r.width and r.height]
+        for regiao in sujos:
+            self.screen.set_clip(regiao)
+            self.screen.fill(self.fundo)
+            for sprite in sprites:
+                area = atuais[sprite][0]
+                if area is not None and area.colliderect(regiao):
+                    sprite.draw(self.screen)
+        self.screen.set_clip(None)
+
+        if sujos:
+            pygame.display.update(sujos)
+            self.regioes += len(sujos)
+            self.pixels += sum(r.width * r.height for r in sujos)
+
+    def stats(self):
+        """Média de regiões e da fração da tela atualizada por quadro."""
+        if not self.quadros:
+            return {"quadros": 0}
+        tela = self.screen.get_width() * self.screen.get_height()
+        return {
+            "quadros": self.quadros,
+            "regioes_por_quadro": round(self.regioes / self.quadros, 1),
+            "fracao_tela": round(self.pixels / self.quadros / tela, 3),
+        }
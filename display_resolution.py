@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+
+# Sobrescreve a detecção, ex.: BORBOLETO_RESOLUTION=1920x1080
+ENV_VAR = "BORBOLETO_RESOLUTION"
+# Qualquer valor não vazio ignora o cache em disco e detecta de novo (ex.: monitor trocado)
+ENV_REDETECTAR = "BORBOLETO_REDETECTAR"
+DRM_PATH = "/sys/class/drm/"
+DRIVERS_SEM_TELA = ("offscreen", "dummy")  # Drivers do SDL sem tela de verdade
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "borboleto", "display_resolution.json")
+
+_resolucao = None  # Cache em memória da resolução detectada
+
+
+def parse_resolution(texto):
+    """Converte '1920x1080' em (1920, 1080)."""
+    try:
+        largura, altura = (int(v) for v in texto.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Resolução inválida: {texto!r} (use LARGURAxALTURA, ex.: 1920x1080)")
+    if largura <= 0 or altura <= 0:
+        raise ValueError(f"Resolução inválida: {texto!r}")
+    return largura, altura
+
+
+def _pygame():
+    """Tamanho do desktop segundo o pygame (SDL), sem abrir janela.
+
+    Sem tela o SDL cai no driver ``offscreen`` (ou ``dummy``), que inventa um
+    desktop de 1024x768: nesse caso retorna None e a detecção segue para o DRM.
+    """
+    import pygame
+    ja_iniciado = pygame.display.get_init()
+    pygame.display.init()
+    try:
+        if pygame.display.get_driver() in DRIVERS_SEM_TELA:
+            return None
+        tamanhos = pygame.display.get_desktop_sizes()
+        if tamanhos and tamanhos[0][0] > 0:
+            return tuple(tamanhos[0])
+        info = pygame.display.Info()
+        if info.current_w > 0 and info.current_h > 0:
+            return info.current_w, info.current_h
+        return None
+    finally:
+        if not ja_iniciado:
+            pygame.display.quit()  # Não deixar o SDL aberto para quem usa só o OpenCV
+
+
+def _windows():
+    import ctypes
+    user32 = ctypes.windll.user32
+    return user32.GetSystemMetrics(0), user32.GetSystemMetrics(1)
+
+
+def _drm():
+    """Primeiro modo de um conector em /sys/class/drm (Linux sem servidor gráfico)."""
+    pasta = DRM_PATH
+    for nome in sorted(os.listdir(pasta)):
+        try:
+            with open(os.path.join(pasta, nome, "modes")) as f:
+                linha = f.readline().strip()
+        except OSError:
+            continue
+        if linha:
+            return parse_resolution(linha.rstrip("i"))  # Modos entrelaçados terminam em 'i'
+    return None
+
+
+DETECTORES = (_pygame, _windows, _drm)
+
+
+def _monitores():
+    """Conectores ligados e hash do EDID de cada um (Linux), ou '' se não der para saber.
+
+    Trocar o monitor muda o EDID, e com ele a chave do cache.
+    """
+    try:
+        nomes = sorted(os.listdir(DRM_PATH))
+    except OSError:
+        return ""
+    conectados = []
+    for nome in nomes:
+        try:
+            with open(os.path.join(DRM_PATH, nome, "status")) as f:
+                if f.read().strip() != "connected":
+                    continue
+            with open(os.path.join(DRM_PATH, nome, "edid"), "rb") as f:
+                edid = hashlib.sha1(f.read()).hexdigest()[:12]
+        except OSError:
+            continue
+        conectados.append(f"{nome}:{edid}")
+    return ",".join(conectados)
+
+
+def _chave_cache():
+    """Identifica a tela: resoluções salvas de outro display ou monitor não valem."""
+    return {
+        "display": os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY") or os.name,
+        "monitores": _monitores(),
+    }
+
+
+def _ler_cache(caminho):
+    try:
+        with open(caminho) as f:
+            dados = json.load(f)
+        if dados.get("chave") == _chave_cache():
+            return tuple(dados["resolution"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _salvar_cache(caminho, resolucao, detector):
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, "w") as f:
+            json.dump({"chave": _chave_cache(), "detector": detector, "resolution": list(resolucao)}, f)
+    except OSError:
+        pass  # Sem cache em disco, detecta de novo na próxima vez
+
+
+def detect_resolution():
+    """Pergunta aos detectores em ordem; retorna a primeira resolução válida e o nome do detector."""
+    for detector in DETECTORES:
+        try:
+            resolucao = detector()
+        except Exception:
+            continue  # Biblioteca ausente, sem display, outro sistema...
+        if resolucao:
+            return tuple(resolucao), detector.__name__.lstrip("_")
+    raise RuntimeError("Não foi possível obter a resolução da tela.")
+
+
+def get_screen_resolution(override=None, cache_path=CACHE_PATH, atualizar=False):
+    """Resolução (largura, altura) da tela, calculada só na primeira chamada.
+
+    Ordem: ``override`` (ex.: opção de linha de comando), variável de ambiente
+    ``BORBOLETO_RESOLUTION``, cache em memória, cache em disco e, por fim, os
+    detectores. O cache em disco vale para o mesmo display e os mesmos monitores;
+    ``atualizar=True`` (ou ``BORBOLETO_REDETECTAR=1``) ignora os caches e detecta de novo.
+    """
+    global _resolucao
+    if override:
+        return parse_resolution(override) if isinstance(override, str) else tuple(override)
+    if os.environ.get(ENV_VAR):
+        return parse_resolution(os.environ[ENV_VAR])
+    atualizar = atualizar or bool(os.environ.get(ENV_REDETECTAR))
+
+    if _resolucao is not None and not atualizar:
+        return _resolucao
+    if cache_path and not atualizar:
+        _resolucao = _ler_cache(cache_path)
+        if _resolucao is not None:
+            return _resolucao
+
+    _resolucao, detector = detect_resolution()
+    if cache_path:
+        _salvar_cache(cache_path, _resolucao, detector)
+    return _resolucao
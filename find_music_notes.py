@@ -1,68 +1,173 @@
+import os
+import click
 import librosa
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import audio_cache
+from pitch import ESTIMADORES, FMIN, estimate, frequencies_to_notes
+from rtttl import BPM_PADRAO, RtttlWriter, to_rtttl
 
-# Função para mapear frequências para notas musicais
-def frequency_to_note(freq):
-    A4 = 440  # Hz
-    C0 = A4 * 2**(-4.75)
-    h = round(12 * np.log2(freq / C0))
-    octave = h // 12
-    n = h % 12
-    note_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-    if n >= 0 and n < len(note_names):
-        return note_names[n] + str(octave)
-    return None
-
-# Carregar o arquivo MP3, limitando para os primeiros 15 segundos
-audio_file = 'todoenrolado.mp3'  # Certifique-se de que este arquivo está no mesmo diretório que o script
-y, sr = librosa.load(audio_file, duration=10.0)
-
-# Definir um intervalo de tempo (em segundos) para calcular a frequência
-frame_length = 2048
-hop_length = 512
-num_frames = int(np.ceil(len(y) / hop_length))
-
-# Listas para armazenar notas
-notes = []
-
-# Calcular a frequência média em cada quadro
-for i in range(num_frames):
-    start = i * hop_length
-    end = start + frame_length
-    if end <= len(y):
-        frame = y[start:end]
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+ESTIMADOR = 'yin'  # Ver pitch.ESTIMADORES
+LIMIAR_SILENCIO = 1e-3  # Amplitude mínima (pico de uma senoide equivalente) para o quadro ter nota
+CONFIANCA_MIN = 0.3  # Abaixo disso a estimativa do quadro vira pausa
+LOTE = 512  # Quadros por FFT em lote (limita a memória em faixas longas)
+SR_PADRAO = 22050  # Taxa do librosa.load; o streaming mantém a taxa do arquivo
+BLOCO = 65536  # Amostras lidas por vez no streaming
+
+
+def frame_signal(y, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+    """Quadros (n, frame_length) do sinal, sem cópia.
+
+    O fim é completado com zeros para que o último quadro tenha o mesmo tamanho
+    (e o mesmo espaçamento entre bins) dos outros. Sinal vazio dá zero quadros.
+    """
+    if len(y) == 0:
+        return np.empty((0, frame_length), dtype=y.dtype)
+    num_frames = int(np.ceil(len(y) / hop_length))
+    total = (num_frames - 1) * hop_length + frame_length
+    if total > len(y):
+        y = np.concatenate([y, np.zeros(total - len(y), dtype=y.dtype)])
+    return sliding_window_view(y, frame_length)[::hop_length]
+
+
+def frame_peaks(frames, sr, metodo=ESTIMADOR, fmin=FMIN, limiar=LIMIAR_SILENCIO,
+                confianca_min=CONFIANCA_MIN, lote=LOTE):
+    """Frequência fundamental (Hz) de cada quadro (n, frame_length), NaN nos quadros
+    silenciosos ou em que o estimador ``metodo`` (de pitch.py) não tem confiança.
+
+    Processa em lotes de ``lote`` quadros para limitar a memória.
+    """
+    freqs = np.empty(len(frames))
+    for inicio in range(0, len(frames), lote):
+        bloco = np.asarray(frames[inicio:inicio + lote], dtype=np.float32)
+        estimadas, confianca = estimate(bloco, sr, metodo, fmin=fmin)
+        # Amplitude de uma senoide com o mesmo RMS do quadro
+        amplitude = np.sqrt(2 * np.mean(bloco * bloco, axis=1))
+        estimadas[(amplitude < limiar) | (confianca < confianca_min)] = np.nan
+        freqs[inicio:inicio + lote] = estimadas
+    return freqs
+
+
+def dominant_frequencies(y, sr, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, **kwargs):
+    """Frequência fundamental (Hz) de cada quadro do sinal, NaN nos quadros sem nota."""
+    frames = frame_signal(np.asarray(y, dtype=np.float32), frame_length, hop_length)
+    return frame_peaks(frames, sr, **kwargs)
+
+
+def stream_frequencies(blocks, sr, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, **kwargs):
+    """Versão em streaming de dominant_frequencies: recebe blocos de amostras de qualquer
+    tamanho e gera as frequências de cada bloco assim que os quadros ficam completos.
+
+    Entre blocos fica guardado só o trecho que ainda não formou quadro (menos de
+    ``frame_length + hop_length`` amostras), então a memória não depende da duração.
+    O resultado é o mesmo de ``dominant_frequencies`` sobre o sinal inteiro.
+    """
+    resto = np.zeros(0, dtype=np.float32)
+    for block in blocks:
+        buffer = np.concatenate([resto, np.asarray(block, dtype=np.float32)])
+        if len(buffer) < frame_length:
+            resto = buffer
+            continue
+        completos = (len(buffer) - frame_length) // hop_length + 1
+        frames = sliding_window_view(buffer, frame_length)[::hop_length][:completos]
+        yield frame_peaks(frames, sr, **kwargs)
+        resto = buffer[completos * hop_length:]
+
+    # Últimos quadros, completados com zeros como em frame_signal
+    if len(resto):
+        yield frame_peaks(frame_signal(resto, frame_length, hop_length), sr, **kwargs)
+
+
+def stream_parameters(audio_file):
+    """(sr, frame_length, hop_length) do streaming: a taxa original do arquivo, sem
+    reamostrar, com quadro e hop escalados para cobrir o mesmo tempo que a 22050 Hz.
+
+    Por causa do arredondamento (e de não reamostrar), notas e durações podem
+    diferir um pouco das do caminho com ``librosa.load``.
+    """
+    sr = librosa.get_samplerate(audio_file)
+    return sr, round(FRAME_LENGTH * sr / SR_PADRAO), round(HOP_LENGTH * sr / SR_PADRAO)
+
+
+def stream_notes(audio_file, block_size=BLOCO, duration=None, **kwargs):
+    """Gera a nota (ou None, nos quadros sem nota) de cada quadro do arquivo, lendo aos poucos.
+
+    Cada quadro dura ``hop_length / sr`` segundos de ``stream_parameters``.
+    """
+    if duration is not None and duration <= 0:
+        return  # O librosa.stream leria a faixa inteira com duration=0
+    sr, frame_length, hop_length = stream_parameters(audio_file)
+    blocks = librosa.stream(audio_file, block_length=block_size, frame_length=1, hop_length=1,
+                            mono=True, duration=duration, fill_value=None)
+    for freqs in stream_frequencies(blocks, sr, frame_length, hop_length, **kwargs):
+        yield from frequencies_to_notes(freqs)
+
+
+def find_notes(y, sr, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, **kwargs):
+    """Nota de cada quadro com som, em ordem."""
+    notes = frequencies_to_notes(dominant_frequencies(y, sr, frame_length, hop_length, **kwargs))
+    return [note for note in notes if note]
+
+
+# Converter a sequência de notas (uma por quadro, None no silêncio) para notação RTTTL
+def convert_to_rtttl(notes, frame_seconds=HOP_LENGTH / SR_PADRAO, bpm=BPM_PADRAO, name="melody"):
+    return to_rtttl(notes, frame_seconds, name=name, bpm=bpm)
+
+
+def write_rtttl_stream(notes, output_file, frame_seconds=HOP_LENGTH / SR_PADRAO, bpm=BPM_PADRAO, name="melody"):
+    """Grava as notas em RTTTL conforme chegam, sem guardar a sequência. Retorna quantos tokens."""
+    with open(output_file, 'w') as file:
+        writer = RtttlWriter(file, frame_seconds, name=name, bpm=bpm)
+        for note in notes:
+            writer.write(note)
+        writer.close()
+    return writer.tokens
+
+
+@click.command()
+@click.argument('audio_file', default='todoenrolado.mp3')
+@click.option('--duration', type=float, default=None, help='Segundos analisados (padrão: a faixa inteira).')
+@click.option('--output', 'output_file', default='notes_rtttl.txt', show_default=True, help='Arquivo RTTTL de saída.')
+@click.option('--stream', is_flag=True,
+              help='Lê e grava aos poucos, com memória constante (faixas longas). Lê na taxa original do '
+                   'arquivo, sem reamostrar para 22050 Hz: as notas podem diferir um pouco do modo normal.')
+@click.option('--bpm', default=BPM_PADRAO, show_default=True, help='Andamento (b=) usado para quantizar as durações.')
+@click.option('--nome', default=None, help='Nome da melodia no RTTTL (padrão: nome do arquivo de áudio).')
+@click.option('--estimador', type=click.Choice(list(ESTIMADORES)), default=ESTIMADOR, show_default=True,
+              help='Estimador de frequência fundamental (pitch.py).')
+@click.option('--confianca', default=CONFIANCA_MIN, show_default=True,
+              help='Confiança mínima (0 a 1) para o quadro virar nota; abaixo vira pausa.')
+@click.option('--sem-cache', is_flag=True, help='Decodifica o áudio de novo em vez de usar o cache (audio_cache.py).')
+def main(audio_file, duration, output_file, stream, bpm, nome, estimador, confianca, sem_cache):
+    """Extrai a nota de cada quadro do áudio e grava em RTTTL."""
+    nome = nome or os.path.splitext(os.path.basename(audio_file))[0]
+    opcoes = dict(metodo=estimador, confianca_min=confianca)
+    if stream:
+        sr, _, hop_length = stream_parameters(audio_file)
+        notes = stream_notes(audio_file, duration=duration, **opcoes)
+        total = write_rtttl_stream(notes, output_file, hop_length / sr, bpm=bpm, name=nome)
+        print(f"{total} elementos RTTTL (notas e pausas) salvos em {output_file}")
+        return
+
+    if sem_cache:
+        y, sr = librosa.load(audio_file, duration=duration)
     else:
-        frame = y[start:]
-
-    # Calcular a Transformada Rápida de Fourier (FFT)
-    fft_result = np.fft.fft(frame)
-    frequencies = np.abs(fft_result)
-
-    # Encontre a frequência mais alta em cada quadro
-    dominant_frequency_index = np.argmax(frequencies)
-    dominant_frequency = dominant_frequency_index * (sr / len(frame))
-
-    # Converter a frequência dominante para uma nota musical
-    note = frequency_to_note(dominant_frequency)
-    if note:  # Adicionar nota se não for None
-        notes.append(note)
-
-# Converter a sequência de notas para notação RTTTL
-def convert_to_rtttl(notes):
-    rtttl = "melody:d=4,o=5,b=100:"
-    for note in notes:
-        if note:
-            rtttl += f"{note},"
-    return rtttl.rstrip(',')  # Remove a última vírgula
-
-# Exibir a sequência de notas em notação RTTTL
-rtttl_output = convert_to_rtttl(notes)
-print("Sequência de notas em notação RTTTL:")
-print(rtttl_output)
-
-# Salvar a sequência de notas em um arquivo .txt
-output_file = 'notes_rtttl.txt'  # Nome do arquivo
-with open(output_file, 'w') as file:
-    file.write(rtttl_output)
-
-print(f"As notas foram salvas em {output_file}")
+        y, sr = audio_cache.load(audio_file, duration=duration)  # np.memmap do .npy decodificado
+    notes = frequencies_to_notes(dominant_frequencies(y, sr, **opcoes))  # None nos quadros sem nota
+
+    # Exibir a sequência de notas em notação RTTTL
+    rtttl_output = convert_to_rtttl(notes, HOP_LENGTH / sr, bpm=bpm, name=nome)
+    print("Sequência de notas em notação RTTTL:")
+    print(rtttl_output)
+
+    # Salvar a sequência de notas em um arquivo .txt
+    with open(output_file, 'w') as file:
+        file.write(rtttl_output)
+
+    print(f"As notas foram salvas em {output_file}")
+
+
+if __name__ == '__main__':
+    main()
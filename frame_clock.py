@@ -0,0 +1,34 @@
+from collections import deque
+import pygame
+
+
+class FrameClock:
+    """``pygame.time.Clock`` com estatísticas dos tempos de quadro."""
+
+    def __init__(self, fps, janela=120):
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.quadros = 0
+        self.tempos = deque(maxlen=janela)  # ms entre quadros, incluindo a espera
+        self.trabalho = deque(maxlen=janela)  # ms gastos no quadro, sem a espera
+
+    def tick(self):
+        """Espera o que falta do quadro e retorna os ms desde o tick anterior."""
+        ms = self.clock.tick(self.fps)
+        self.tempos.append(ms)
+        self.trabalho.append(self.clock.get_rawtime())
+        self.quadros += 1
+        return ms
+
+    def stats(self):
+        """FPS medido e tempos de quadro (médio e máximo) da janela recente."""
+        if not self.tempos:
+            return {"quadros": 0}
+        return {
+            "quadros": self.quadros,
+            "fps": round(self.clock.get_fps(), 1),
+            "quadro_ms": round(sum(self.tempos) / len(self.tempos), 1),
+            "quadro_max_ms": max(self.tempos),
+            "trabalho_ms": round(sum(self.trabalho) / len(self.trabalho), 1),
+            "trabalho_max_ms": max(self.trabalho),
+        }
@@ -0,0 +1,70 @@
+import time
+import cv2
+
+
+class FrameDisplay:
+    """Destino dos quadros compostos: janela do OpenCV, arquivo de vídeo ou nada (headless).
+
+    ``show`` respeita o limite opcional de FPS esperando o que falta até o próximo
+    quadro. Deve rodar numa thread só (de preferência a principal), longe da
+    thread da serial: ``imshow``/``waitKey`` podem bloquear.
+    """
+
+    def __init__(self, titulo, fps_max=None, headless=False, video=None, fps_video=30):
+        self.titulo = titulo
+        self.fps_max = fps_max
+        self.headless = headless or video is not None  # Gravando vídeo não abre janela
+        self.video = video
+        self.fps_video = fps_max or fps_video
+        self._writer = None
+        self._proximo = 0.0  # Instante mínimo do próximo quadro, com fps_max
+
+        # Estatísticas
+        self.quadros = 0
+        self._inicio = None
+
+    def _abrir_video(self, frame):
+        altura, largura = frame.shape[:2]
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        self._writer = cv2.VideoWriter(self.video, fourcc, self.fps_video, (largura, altura))
+        if not self._writer.isOpened():
+            raise IOError(f"Não foi possível gravar o vídeo em {self.video}")
+
+    def show(self, frame):
+        """Mostra, grava ou descarta o quadro. O quadro pode ser reutilizado ao retornar."""
+        if self.fps_max:
+            espera = self._proximo - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            self._proximo = max(self._proximo, time.monotonic() - 1 / self.fps_max) + 1 / self.fps_max
+
+        if self.video is not None:
+            if self._writer is None:
+                self._abrir_video(frame)
+            self._writer.write(frame)
+        elif not self.headless:
+            cv2.imshow(self.titulo, frame)
+            cv2.waitKey(1)
+
+        if self._inicio is None:
+            self._inicio = time.monotonic()
+        self.quadros += 1
+
+    def poll(self):
+        """Processa os eventos da janela quando não há quadro novo."""
+        if not self.headless:
+            cv2.waitKey(1)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        if not self.headless:
+            cv2.destroyAllWindows()
+
+    def stats(self):
+        """Quadros mostrados e a taxa média desde o primeiro."""
+        if self._inicio is None or self.quadros < 2:
+            return {"quadros": self.quadros}
+        decorrido = time.monotonic() - self._inicio
+        return {"quadros": self.quadros, "fps": round((self.quadros - 1) / decorrido, 1)}
@@ -0,0 +1,54 @@
+import threading
+
+
+class FrameMailbox:
+    """Caixa de uma só posição entre a serial e a renderização: o quadro mais novo vence.
+
+    ``put`` nunca bloqueia. Se o quadro anterior ainda não foi consumido, ele é
+    substituído (coalescido), então quem renderiza sempre recebe o conjunto de
+    caixas mais recente e a latência não cresce com a velocidade do sensor.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._novo = False
+
+        # Estatísticas
+        self.recebidos = 0
+        self.coalescidos = 0
+        self.renderizados = 0
+
+    def put(self, frame):
+        """Guarda o quadro, descartando o anterior se ele ainda não foi lido."""
+        with self._cond:
+            self.recebidos += 1
+            if self._novo:
+                self.coalescidos += 1
+            self._frame = frame
+            self._novo = True
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Retorna o quadro mais novo, esperando até ``timeout`` segundos. None se não houver."""
+        with self._cond:
+            if not self._novo and not self._cond.wait_for(lambda: self._novo, timeout):
+                return None
+            frame = self._frame
+            self._frame = None
+            self._novo = False
+            self.renderizados += 1
+            return frame
+
+    def get_nowait(self):
+        """Retorna o quadro mais novo sem esperar. None se não houver."""
+        return self.get(timeout=0)
+
+    def stats(self):
+        """Contadores de quadros recebidos, coalescidos e renderizados."""
+        with self._cond:
+            return {
+                "recebidos": self.recebidos,
+                "coalescidos": self.coalescidos,
+                "renderizados": self.renderizados,
+            }
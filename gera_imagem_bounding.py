@@ -1,12 +1,12 @@
-import os
 import random
 import time
 import threading
 import pygame
 import click
 from PIL import Image, ImageFilter
-from sscma.micro.client import SerialClient
 from sscma.micro.device import Device
+from serial_ingest import BlockingSerialClient
+from boleto_cache import BoletoCache, MEMORIA_PADRAO
 
 
 class BoundingBoxSprite(pygame.sprite.Sprite):
@@ -34,11 +34,10 @@ class BoundingBoxSprite(pygame.sprite.Sprite):
 
 
 class ImageFiller:
-    def __init__(self, pasta_imagens):        
+    def __init__(self, pasta_imagens, memoria_cache=MEMORIA_PADRAO):
         # Inicializar atributos
         self.fps = 15
         self.pasta_imagens = pasta_imagens
-        self.imagens = [os.path.join(pasta_imagens, img) for img in os.listdir(pasta_imagens) if img.endswith('.png')]
         self.intervalo = 1 / self.fps
         self.stop_thread = False
         self.connected = False  # Sinalizador para indicar se a conexão foi estabelecida
@@ -52,10 +51,15 @@ class ImageFiller:
         self.rect_h = self.screen_info.current_h
         self.offset = (self.rect_w - self.rect_h) // 2  # Cálculo do offset para centralizar
 
+        # Decodificar os boletos uma única vez, já limitados à altura da tela
+        self.boletos = BoletoCache(pasta_imagens, memoria_max=memoria_cache, altura_max=self.rect_h)
+        self.imagens = self.boletos.caminhos
+
     def update(self, port, baudrate):
         """Conecta à porta serial e atualiza as bounding boxes."""
         try:
-            client = SerialClient(port, baudrate)
+            # Só as caixas interessam: o campo "image" é descartado ainda nos bytes
+            client = BlockingSerialClient(port, baudrate, boxes_only=True)
             device = Device(client)
 
             def on_monitor(device, msg):
@@ -98,7 +102,7 @@ class ImageFiller:
             def on_connect(device):
                 click.echo("Device connected")
                 self.connected = True  # Atualiza o sinalizador de conexão
-                device.Invoke(-1)
+                device.Invoke(-1, False, False)  # Pedir ao dispositivo que não envie as imagens
 
             def on_disconnect(device):
                 click.echo("Device disconnected")
@@ -152,8 +156,7 @@ class ImageFiller:
         scaled_h = int(h * scale_factor)
 
         # Escolher uma imagem aleatória da pasta
-        img_path = random.choice(self.imagens)
-        imagem = Image.open(img_path).convert('RGBA')
+        imagem = self.boletos.random()
 
         # Manter a proporção da imagem original ao redimensionar
 
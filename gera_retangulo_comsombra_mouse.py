@@ -7,6 +7,7 @@ import click
 from PIL import Image, ImageFilter
 from sscma.micro.client import SerialClient
 from sscma.micro.device import Device
+from canvas import Canvas
 
 
 class ImageFiller:
@@ -35,7 +36,8 @@ class ImageFiller:
         self.rect_h = self.screen_info.current_h       
         self.rect_x = 0 
         self.rect_y = 0
-        self.retangulo = Image.new('RGBA', (self.rect_w, self.rect_h), (0, 0, 0, 255))  # Correção dos atributos w e h
+        # Canvas acumulado direto numa Surface: só as regiões coladas mudam a cada quadro
+        self.retangulo = Canvas((self.rect_w, self.rect_h))
 
     def update(self, port, baudrate):
         """Conecta à porta serial e atualiza as bounding boxes."""
@@ -157,8 +159,8 @@ class ImageFiller:
             pos_y = random.randint(scaled_y, max(scaled_y, scaled_y + scaled_h - new_height))
 
             # Colocar a sombra e a imagem no retângulo
-            self.retangulo.paste(shadow, (pos_x, pos_y + 10), shadow)  # Colocar sombra abaixo
-            self.retangulo.paste(imagem, (pos_x, pos_y), imagem)
+            self.retangulo.paste(shadow, (pos_x, pos_y + 10))  # Colocar sombra abaixo
+            self.retangulo.paste(imagem, (pos_x, pos_y))
 
             time.sleep(self.intervalo)
 
@@ -179,19 +181,8 @@ class ImageFiller:
                     if event.key == pygame.K_q:  # Sair ao pressionar 'q'
                         running = False
 
-            # Preencher a tela com preto
-            self.screen.fill((0, 0, 0))
-
-            # Converter a imagem PIL para Surface do Pygame
-            mode = self.retangulo.mode
-            size = self.retangulo.size
-            data = self.retangulo.tobytes()
-            pygame_image = pygame.image.fromstring(data, size, mode)
-
-            # Blitar a imagem no retângulo especificado
-            self.screen.blit(pygame_image, (self.image_x, self.image_y))
-
-            pygame.display.flip()  # Atualizar a tela
+            # Mostrar o retângulo na posição especificada, atualizando só o que mudou
+            self.retangulo.present(self.screen, (self.image_x, self.image_y))
             time.sleep(self.intervalo)
 
         pygame.quit()
@@ -4,6 +4,7 @@ import time
 import threading
 import pygame
 from PIL import Image
+from canvas import Canvas
 
 class ImageFiller:
     def __init__(self, x, y, width, height, fps, pasta_imagens):
@@ -20,7 +21,8 @@ class ImageFiller:
         # Inicializar o Pygame
         pygame.init()
         self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)  # Tela cheia
-        self.retangulo = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 255))
+        # Canvas acumulado direto numa Surface: só as regiões coladas mudam a cada quadro
+        self.retangulo = Canvas((self.width, self.height))
 
     def update(self, x=None, y=None, width=None, height=None, fps=None):
         """Atualiza dinamicamente os parâmetros de posição e tamanho do retângulo."""
@@ -71,7 +73,7 @@ class ImageFiller:
             pos_y = random.randint(0, max(0, self.height - new_height))
 
             # Colocar a imagem no retângulo
-            self.retangulo.paste(imagem, (pos_x, pos_y), imagem)
+            self.retangulo.paste(imagem, (pos_x, pos_y))
 
             time.sleep(self.intervalo)
 
@@ -86,19 +88,8 @@ class ImageFiller:
                     if event.key == pygame.K_q:  # Sair ao pressionar 'q'
                         running = False
 
-            # Preencher a tela com preto
-            self.screen.fill((0, 0, 0))
-
-            # Converter a imagem PIL para Surface do Pygame
-            mode = self.retangulo.mode
-            size = self.retangulo.size
-            data = self.retangulo.tobytes()
-            pygame_image = pygame.image.fromstring(data, size, mode)
-
-            # Blitar a imagem no retângulo especificado
-            self.screen.blit(pygame_image, (self.x, self.y))
-
-            pygame.display.flip()  # Atualizar a tela
+            # Mostrar o retângulo na posição especificada, atualizando só o que mudou
+            self.retangulo.present(self.screen, (self.x, self.y))
             time.sleep(self.intervalo)
 
         pygame.quit()
@@ -2,79 +2,229 @@
 import random
 import datetime
 import faker
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import click
 from pyboleto import pdf
 from pyboleto.bank.bradesco import BoletoBradesco
 from pyboleto.bank.hsbc import BoletoHsbc
 from pyboleto.bank.itau import BoletoItau
 from pyboleto.bank.santander import BoletoSantander
 
-from pdf2image import convert_from_path
+from pdf2image import convert_from_bytes
+from boleto_atlas import build_atlas
+from boleto_manifest import Manifest, chave_parametros, descrever_png
+
+# Lista de classes de boletos dos bancos
+BANCOS = [
+    BoletoBradesco,
+    BoletoHsbc,
+    BoletoItau,
+    BoletoSantander,
+]
+
+# Carteiras sorteadas por banco: o Bradesco usa carteira de 2 dígitos (o campo livre tem 25)
+CARTEIRAS = {BoletoBradesco: ['06', '09']}
+CARTEIRAS_PADRAO = ['109', '110', '112']
+
+# Campos do boleto guardados no manifesto
+CAMPOS = [
+    'carteira', 'agencia_cedente', 'conta_cedente', 'conta_cedente_dv',
+    'data_vencimento', 'valor_documento', 'nosso_numero', 'numero_documento',
+    'cedente', 'cedente_logradouro', 'cedente_documento',
+    'sacado_nome', 'sacado_endereco', 'sacado_documento',
+]
+
+# Rasterização fixa: os PNGs saem já na altura em que são exibidos
+DPI = 150
+ALTURA_PADRAO = 1080  # Altura dos PNGs, a não ser com --altura ou --altura-da-tela
+LOTE_PADRAO = 25  # Boletos por PDF (e por chamada ao poppler)
+
+# Instância do Faker de cada processo, criada uma vez em iniciar_worker
+_fake = None
+
 
 # Função para gerar CPF/CNPJ aleatório
-def gerar_cpf():
-    num = random.randint(100000000, 999999999)
-    cpf = f'{num:09d}-{random.randint(0, 9)}{random.randint(0, 9)}'
+def gerar_cpf(rng=random):
+    num = rng.randint(100000000, 999999999)
+    cpf = f'{num:09d}-{rng.randint(0, 9)}{rng.randint(0, 9)}'
     return cpf
 
 
+def iniciar_worker():
+    """Cria o Faker do processo: construir um Faker por boleto seria lento."""
+    global _fake
+    _fake = faker.Faker()
+
+
+def semente_boleto(seed, i):
+    """Semente do boleto i, derivada da semente mestre.
+
+    Depende só de (seed, i), e não de qual processo gerou o boleto, então o
+    resultado é o mesmo com qualquer número de --jobs.
+    """
+    return f'{seed}:{i}'
+
+
+def arquivo_boleto(i):
+    """Nome do PNG do boleto i dentro da pasta de saída."""
+    return f'boleto_{i + 1}_1.png'
+
+
+# Função para montar os dados de um boleto
+def criar_boleto(i, nome, endereco, seed):
+    if _fake is None:
+        iniciar_worker()
+    semente = semente_boleto(seed, i)
+    rng = random.Random(semente)
+    _fake.seed_instance(semente)
+
+    banco = rng.choice(BANCOS)  # Escolher um banco aleatório
+    d = banco()
+    d.carteira = rng.choice(CARTEIRAS.get(banco, CARTEIRAS_PADRAO))  # Carteira aleatória
+    d.agencia_cedente = str(rng.randint(1000, 9999))  # Agência aleatória
+    d.conta_cedente = str(rng.randint(10000, 99999))  # Conta aleatória
+    d.conta_cedente_dv = str(rng.randint(1, 9))  # DV aleatório
+
+    # Gerar datas aleatórias entre 11 e 15 de outubro de 2024
+    data_vencimento = datetime.date(2024, 10, rng.randint(11, 15))
+    d.data_vencimento = data_vencimento
+    d.data_documento = data_vencimento
+    d.data_processamento = data_vencimento
+
+    # Valor aleatório entre R$200 e R$2500
+    d.valor_documento = round(rng.uniform(200.00, 2500.00), 2)
+    d.nosso_numero = str(157 + i)
+    d.numero_documento = str(456 + i)
+
+    # Definir nome e endereço do pagador e do beneficiario
+    d.cedente = _fake.name()
+    d.cedente_logradouro = _fake.address().replace('\n', ', ')
+    d.cedente_documento = gerar_cpf(rng)  # CPF do beneficiário
+    d.sacado_nome = nome
+    d.sacado_endereco = endereco.replace('\n', ', ')
+    d.sacado_documento = 'Your Doc Here'
+    return d
+
+
+# Função para gerar um lote de boletos: um PDF em memória e uma só rasterização
+def gerar_lote(indices, nome, endereco, seed, pasta='images_png', altura=ALTURA_PADRAO, dpi=DPI, threads=1):
+    # Um boleto por página, num PDF que nunca vai para o disco
+    buffer = io.BytesIO()
+    boleto_pdf = pdf.BoletoPDF(buffer)
+    dados = []
+    for k, i in enumerate(indices):
+        if k:
+            boleto_pdf.nextPage()
+        d = criar_boleto(i, nome, endereco, seed)
+        boleto_pdf.drawBoleto(d)  # Desenhar o boleto no PDF
+        dados.append(d)
+    boleto_pdf.save()  # Finalizar o PDF
+
+    # Converter todas as páginas de uma vez, já na altura de exibição. O arquivo
+    # temporário que o pdf2image passa ao poppler é apagado por ele mesmo
+    images = convert_from_bytes(buffer.getvalue(), dpi=dpi, size=(None, altura), thread_count=threads)
+    if len(images) != len(indices):
+        raise RuntimeError(f'PDF com {len(images)} páginas para {len(indices)} boletos')
+
+    # Salvar os PNGs e descrevê-los para o manifesto (hash e dimensões calculados aqui, em paralelo)
+    gerados = []
+    for i, d, image in zip(indices, dados, images):
+        arquivo = arquivo_boleto(i)
+        png_filename = os.path.join(pasta, arquivo)
+        image.save(png_filename, 'PNG')
+        gerados.append({
+            'arquivo': arquivo,
+            'indice': i,
+            'banco': type(d).__name__,
+            'campos': {campo: str(getattr(d, campo)) for campo in CAMPOS},
+            'descricao': descrever_png(png_filename),
+        })
+    return gerados
+
+
 # Função para gerar boletos
-def gerar_boletos(num_boletos, nome, endereco):
-    # Instância do Faker para gerar dados aleatórios
-    fake = faker.Faker()
-
-    # Lista de classes de boletos dos bancos
-    bancos = [
-        BoletoBradesco,
-        BoletoHsbc,
-        BoletoItau,
-        BoletoSantander,
-    ]
+def gerar_boletos(num_boletos, nome, endereco, seed=0, jobs=None, pasta='images_png',
+                  altura=ALTURA_PADRAO, dpi=DPI, lote=LOTE_PADRAO, threads=1, verificar=False, progresso=None):
+    """Gera, em lotes num pool de processos, só os boletos que faltam ou mudaram.
 
+    O manifesto da pasta diz quais PNGs já existem com os mesmos parâmetros; ele
+    é gravado a cada lote, então um build interrompido continua de onde parou.
+    ``progresso(n)`` é chamado com os já prontos e a cada lote gerado. Retorna os índices gerados.
+    """
     # Criar a pasta images_png se não existir
-    os.makedirs('images_png', exist_ok=True)
-
-    for i in range(num_boletos):
-        d = random.choice(bancos)()  # Escolher um banco aleatório
-        d.carteira = str(random.choice([109, 110, 112]))  # Carteira aleatória
-        d.agencia_cedente = str(random.randint(1000, 9999))  # Agência aleatória
-        d.conta_cedente = str(random.randint(10000, 99999))  # Conta aleatória
-        d.conta_cedente_dv = str(random.randint(1, 9))  # DV aleatório
-
-        # Gerar datas aleatórias entre 11 e 15 de outubro de 2024
-        data_vencimento = datetime.date(2024, 10, random.randint(11, 15))
-        d.data_vencimento = data_vencimento
-        d.data_documento = data_vencimento
-        d.data_processamento = data_vencimento
-
-        # Valor aleatório entre R$200 e R$2500
-        d.valor_documento = round(random.uniform(200.00, 2500.00), 2)
-        d.nosso_numero = str(157 + i)
-        d.numero_documento = str(456 + i)
-
-        # Definir nome e endereço do pagador e do beneficiario
-        d.cedente = fake.name()
-        d.cedente_logradouro = fake.address().replace('\n', ', ')
-        d.cedente_documento = gerar_cpf()  # CPF do beneficiário
-        d.sacado_nome = nome
-        d.sacado_endereco = endereco.replace('\n', ', ')
-        d.sacado_documento = 'Your Doc Here'
-        # Gerar PDF
-        pdf_filename = f'boleto_{i + 1}.pdf'
-
-        # Criar o objeto BoletoPDF
-        boleto_pdf = pdf.BoletoPDF(pdf_filename)
-        boleto_pdf.drawBoleto(d)  # Desenhar o boleto no PDF
-        boleto_pdf.save()  # Salvar o PDF
-
-        # Converter PDF para PNG
-        images = convert_from_path(pdf_filename)
-        for j, image in enumerate(images):
-            png_filename = f'images_png/boleto_{i + 1}_{j + 1}.png'
-            image.save(png_filename, 'PNG')
-
-# Defina seu nome e endereço aqui
-seu_nome = "Your Name Here"
-seu_endereco = "Your Address Here"
-# Gerar 100 boletos
-gerar_boletos(100, seu_nome, seu_endereco)
+    os.makedirs(pasta, exist_ok=True)
+
+    manifest = Manifest.load(pasta)
+    chaves = {arquivo_boleto(i): chave_parametros(seed=seed, indice=i, nome=nome, endereco=endereco,
+                                                  altura=altura, dpi=dpi)
+              for i in range(num_boletos)}
+    pendentes = set(manifest.pendentes(chaves, verificar_hash=verificar))
+    indices = [i for i in range(num_boletos) if arquivo_boleto(i) in pendentes]
+
+    if progresso is not None:
+        progresso(num_boletos - len(indices))  # Os que já estavam prontos
+
+    lotes = [indices[inicio:inicio + lote] for inicio in range(0, len(indices), lote)]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=iniciar_worker) as executor:
+        futuros = {executor.submit(gerar_lote, indices_lote, nome, endereco, seed, pasta, altura, dpi, threads): indices_lote
+                   for indices_lote in lotes}
+        for futuro in as_completed(futuros):
+            for gerado in futuro.result():
+                manifest.registrar(gerado['arquivo'], chaves[gerado['arquivo']], gerado['descricao'],
+                                   seed=seed, indice=gerado['indice'], banco=gerado['banco'],
+                                   campos=gerado['campos'])
+            manifest.save()
+            if progresso is not None:
+                progresso(len(futuros[futuro]))
+    manifest.save()  # Também grava os mtimes revalidados por hash
+    return indices
+
+
+def altura_da_tela():
+    """Altura da tela desta máquina, ou ALTURA_PADRAO se não houver tela.
+
+    Só com --altura-da-tela: um build offline não deve depender (nem mexer) na tela.
+    """
+    from display_resolution import get_screen_resolution
+    try:
+        return get_screen_resolution()[1]
+    except RuntimeError:
+        return ALTURA_PADRAO
+
+
+@click.command()
+@click.option('--quantidade', '-n', default=100, show_default=True, help='Número de boletos.')
+@click.option('--nome', default='Your Name Here', show_default=True, help='Nome do pagador.')
+@click.option('--endereco', default='Your Address Here', show_default=True, help='Endereço do pagador.')
+@click.option('--seed', type=int, default=None, help='Semente mestre (aleatória se omitida).')
+@click.option('--jobs', '-j', type=int, default=None, help='Processos em paralelo (padrão: um por CPU).')
+@click.option('--pasta', default='images_png', show_default=True, help='Pasta de saída dos PNGs.')
+@click.option('--altura', type=int, default=ALTURA_PADRAO, show_default=True, help='Altura dos PNGs em pixels.')
+@click.option('--altura-da-tela', 'usar_tela', is_flag=True, help='Usa a altura da tela desta máquina no lugar de --altura.')
+@click.option('--dpi', default=DPI, show_default=True, help='Resolução da rasterização.')
+@click.option('--lote', default=LOTE_PADRAO, show_default=True, help='Boletos por PDF rasterizado de uma vez.')
+@click.option('--threads', default=1, show_default=True, help='Processos do poppler por lote (thread_count).')
+@click.option('--verificar', is_flag=True, help='Confere o hash de todos os PNGs existentes, não só tamanho e data.')
+@click.option('--atlas', is_flag=True, help='Empacota os PNGs no atlas RGBA (boleto_atlas.py) ao final.')
+def main(quantidade, nome, endereco, seed, jobs, pasta, altura, usar_tela, dpi, lote, threads, verificar, atlas):
+    """Gera boletos aleatórios em PNG, em paralelo e de forma reprodutível com --seed."""
+    if seed is None:
+        # Sem seed, reaproveitar a do manifesto para que o build seja incremental
+        seeds = {e.get('seed') for e in Manifest.load(pasta).entradas.values()}
+        seed = seeds.pop() if len(seeds) == 1 else random.randrange(2 ** 32)
+    if usar_tela:
+        altura = altura_da_tela()
+    click.echo(f'Gerando {quantidade} boletos com seed {seed}, {altura} px de altura')
+    with click.progressbar(length=quantidade, label='Boletos') as barra:
+        gerados = gerar_boletos(quantidade, nome, endereco, seed=seed, jobs=jobs, pasta=pasta, altura=altura,
+                                dpi=dpi, lote=lote, threads=threads, verificar=verificar, progresso=barra.update)
+    click.echo(f'{len(gerados)} gerados, {quantidade - len(gerados)} já estavam prontos')
+    if atlas:
+        indice = build_atlas(pasta)
+        click.echo(f"Atlas com {len(indice['sprites'])} boletos em {len(indice['arquivos'])} arquivo(s)")
+
+
+if __name__ == '__main__':
+    main()
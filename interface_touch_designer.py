@@ -1,24 +1,22 @@
-import base64
 import json
 import click
 from pythonosc import udp_client
-from sscma.micro.client import SerialClient
 from sscma.micro.device import Device
+from serial_ingest import BlockingSerialClient
 
 class USBtoTouchDesignerOSC:
-    def __init__(self, port, baudrate, osc_ip, osc_port):
+    def __init__(self, port, baudrate, osc_ip, osc_port, enviar_imagens=True):
         self.port = port
         self.baudrate = baudrate
+        self.enviar_imagens = enviar_imagens  # False: só as bounding boxes trafegam na serial
         self.osc_client = udp_client.SimpleUDPClient(osc_ip, osc_port)
         self.connected = False
 
     def process_data(self, data):
         """Processa os dados recebidos da serial: imagens e bounding boxes."""
-        if "image" in data:
-            # Decodificar a imagem base64
-            image_b64 = data["image"]
-            image_data = base64.b64decode(image_b64)
-            self.send_image_to_touchdesigner(image_b64)  # Enviar imagem codificada base64 via OSC
+        if self.enviar_imagens and data.get("image"):
+            # A imagem segue em base64 para o TouchDesigner, sem decodificar aqui
+            self.send_image_to_touchdesigner(data["image"])  # Enviar imagem codificada base64 via OSC
         
         if "boxes" in data:
             # Obter as bounding boxes em formato JSON
@@ -44,6 +42,8 @@ class USBtoTouchDesignerOSC:
     def on_connect(self, device):
         click.echo("Dispositivo conectado")
         self.connected = True
+        if not self.enviar_imagens:
+            device.Invoke(-1, False, False)  # Pedir ao dispositivo que não envie as imagens
 
     def on_disconnect(self, device):
         click.echo("Dispositivo desconectado")
@@ -52,7 +52,8 @@ class USBtoTouchDesignerOSC:
     def start_device(self):
         """Inicializa a conexão com o dispositivo e começa a monitorar."""
         try:
-            client = SerialClient(self.port, self.baudrate)
+            # Sem imagens, o campo "image" é descartado ainda nos bytes
+            client = BlockingSerialClient(self.port, self.baudrate, boxes_only=not self.enviar_imagens)
             device = Device(client)
 
             device.on_connect = self.on_connect
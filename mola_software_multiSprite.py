@@ -1,12 +1,17 @@
-import os
 import random
 import time
 import threading
 import pygame
 import click
 from PIL import Image, ImageFilter
-from sscma.micro.client import SerialClient
 from sscma.micro.device import Device
+from serial_ingest import BlockingSerialClient
+from boleto_cache import BoletoCache, MEMORIA_PADRAO
+from dirty_renderer import DirtyRenderer
+from frame_clock import FrameClock
+from frame_mailbox import FrameMailbox
+from sprite_bank import BOLETOS_PADRAO, ROTACAO_PADRAO, SpriteBank
+from tracker import IoUTracker, CONFIRMED
 
 
 class BoundingBoxSprite(pygame.sprite.Sprite):
@@ -40,23 +45,39 @@ class BoundingBoxSprite(pygame.sprite.Sprite):
 
 
 class ImageFiller:
-    def __init__(self, pasta_imagens, music_file):
+    def __init__(self, pasta_imagens, music_file, memoria_cache=MEMORIA_PADRAO, dirty_rects=False,
+                 banco_boletos=BOLETOS_PADRAO, banco_rotacao=ROTACAO_PADRAO):
         # Inicializar atributos
         self.fps = 30
         self.pasta_imagens = pasta_imagens
-        self.imagens = [os.path.join(pasta_imagens, img) for img in os.listdir(pasta_imagens) if img.endswith('.png')]
         self.intervalo = 1 / self.fps
         self.stop_thread = False
         self.connected = False  # Sinalizador para indicar se a conexão foi estabelecida
         self.sprites = pygame.sprite.Group()  # Grupo de sprites
+        self.mailbox = FrameMailbox()  # Último conjunto de caixas recebido da serial
+        self.clock = FrameClock(self.fps)  # Ritmo dos quadros e estatísticas de tempo
+        self.tracker = IoUTracker()  # IDs estáveis por pessoa, independentes do target_id da câmera
+        self.sprites_por_track = {}  # track.id -> BoundingBoxSprite
 
         # Inicializar o Pygame
         pygame.init()
         pygame.mixer.init()  # Inicializar o mixer do Pygame
         self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)  # Tela cheia
+        # Opcional: redesenhar só as regiões onde os sprites mudaram
+        self.dirty_renderer = DirtyRenderer(self.screen) if dirty_rects else None
         self.screen_info = pygame.display.Info()
         self.rect_w = self.screen_info.current_w
         self.rect_h = self.screen_info.current_h
+
+        # Decodificar os boletos uma única vez, já limitados à altura da tela
+        self.boletos = BoletoCache(pasta_imagens, memoria_max=memoria_cache, altura_max=self.rect_h)
+        self.imagens = self.boletos.caminhos
+
+        # Variantes pré-renderizadas (escala × ângulo), geradas em segundo plano
+        # banco_boletos boletos ficam prontos por vez (~35 MB cada); a cada banco_rotacao
+        # segundos um deles é trocado pelo próximo, para que todos os boletos apareçam
+        self.banco = SpriteBank(self.boletos, self.create_shadow, max_boletos=banco_boletos, rotacao=banco_rotacao)
+
         self.offset = (self.rect_w - self.rect_h) // 2  # Cálculo do offset para centralizar
 
         # Carregar a música
@@ -65,50 +86,19 @@ class ImageFiller:
     def update(self, port, baudrate):
         """Conecta à porta serial e atualiza as bounding boxes."""
         try:
-            client = SerialClient(port, baudrate)
+            # Só as caixas interessam: o campo "image" é descartado ainda nos bytes
+            client = BlockingSerialClient(port, baudrate, boxes_only=True)
             device = Device(client)
 
             def on_monitor(device, msg):
-                data = msg
-                if "image" in data:
-                    del data["image"]
-                    del data["count"]
-                    del data["perf"]
-                    del data["resolution"]
-                    del data["rotate"]
-
-                if "boxes" in data:
-                    bounding_boxes = data["boxes"]
-                    for box in bounding_boxes:
-                        if box != []:
-                            # Extrair as dimensões da bounding box x,y,w,h, score, target_id
-                            x, y, w, h, score, target = box[0], box[1], box[2], box[3], box[4], box[5]
-
-                            # Ajustar a posição da bounding box com o offset
-                            x += self.offset
-
-                            # Verifica se o sprite já existe, caso contrário cria um novo
-                            sprite = next((s for s in self.sprites if s.target_id == target), None)
-                            if not sprite:
-                                sprite = BoundingBoxSprite(x, y, w, h, target)
-                                self.sprites.add(sprite)
-
-                            # Criar a imagem do sprite
-                            sprite_image, shadow = self.create_sprite_image(w, h)
-                            sprite.add_image(sprite_image, shadow)  # Adiciona a nova imagem e sombra à pilha
-                            sprite.update(x, y, w, h)  # Atualiza a posição do sprite
-
-                    # Manter os sprites que estão nas listas de bounding boxes
-                    for sprite in self.sprites:
-                        if not any(sprite.target_id == box[5] for box in bounding_boxes if box != []):
-                            # Remover uma imagem da pilha se não houver bounding box correspondente
-                            if sprite.images:
-                                sprite.images.pop(0)  # Remove a primeira imagem da pilha
+                # Só guardar as caixas: o quadro mais novo substitui o que ainda não foi processado
+                if "boxes" in msg:
+                    self.mailbox.put(msg["boxes"])
 
             def on_connect(device):
                 click.echo("Device connected")
                 self.connected = True  # Atualiza o sinalizador de conexão
-                device.Invoke(-1)
+                device.Invoke(-1, False, False)  # Pedir ao dispositivo que não envie as imagens
 
             def on_disconnect(device):
                 click.echo("Device disconnected")
@@ -136,9 +126,41 @@ class ImageFiller:
         except Exception as e:
             click.echo("Error: {}".format(e))
 
+    def process_boxes(self, bounding_boxes):
+        """Associa as bounding boxes do quadro mais recente aos sprites, pelo rastreador."""
+        # Ajustar a posição das bounding boxes com o offset: x, y, w, h, score, target_id
+        detections = [(box[0] + self.offset, box[1], box[2], box[3]) for box in bounding_boxes if box != []]
+        self.tracker.update(detections)
+
+        for track in self.tracker.tracks:
+            sprite = self.sprites_por_track.get(track.id)
+            if track.matched and track.state == CONFIRMED:
+                x, y, w, h = (int(v) for v in track.box)
+                if not sprite:
+                    sprite = BoundingBoxSprite(x, y, w, h, track.id)
+                    self.sprites.add(sprite)
+                    self.sprites_por_track[track.id] = sprite
+
+                # A pilha já renderizada é reaproveitada: só gerar imagem enquanto ela não estiver cheia
+                if len(sprite.images) <= sprite.stack_num:
+                    sprite_image, shadow = self.create_sprite_image(w, h)
+                    sprite.add_image(sprite_image, shadow)  # Adiciona a nova imagem e sombra à pilha
+                sprite.update(x, y, w, h)  # Atualiza a posição do sprite
+            elif sprite and sprite.images:
+                # Remover uma imagem da pilha enquanto a pessoa estiver perdida
+                sprite.images.pop(0)
+                sprite.shadows.pop(0)
+
+        # Tracks que passaram do max_age deixam de existir
+        for track_id in self.tracker.removidas:
+            sprite = self.sprites_por_track.pop(track_id, None)
+            if sprite:
+                self.sprites.remove(sprite)
+
     def stop(self):
         """Encerra as threads."""        
         self.stop_thread = True
+        self.banco.stop()
 
     def create_shadow(self, img, angle):
         """Cria uma sombra para a imagem rotacionada."""        
@@ -161,9 +183,13 @@ class ImageFiller:
         scaled_w = int(w * scale_factor)
         scaled_h = int(h * scale_factor)
 
+        # Usar uma variante pré-renderizada quando o banco já tiver essa escala
+        variante = self.banco.get(scaled_h)
+        if variante is not None:
+            return variante
+
         # Escolher uma imagem aleatória da pasta
-        img_path = random.choice(self.imagens)
-        imagem = Image.open(img_path).convert('RGBA')
+        imagem = self.boletos.random()
 
         # Manter a proporção da imagem original ao redimensionar
         aspect_ratio = imagem.width / imagem.height
@@ -188,33 +214,39 @@ class ImageFiller:
         return not any(pixels)
 
 
-    def fill(self):
-        """Função que preenche a tela com imagens sobrepostas, até 20 vezes por bounding box."""        
-        while not self.stop_thread:
-            self.screen.fill((0, 0, 0))  # Limpar a tela
+    def render_frame(self):
+        """Compõe um quadro: caixas mais recentes, sprites, flip e estado da música."""
+        # convert_alpha das variantes do banco sorteadas desde o último quadro (thread principal)
+        self.banco.converter_pendentes()
 
-            # Desenhar todos os sprites
+        # Processar só o conjunto de caixas mais recente
+        bounding_boxes = self.mailbox.get_nowait()
+        if bounding_boxes is not None:
+            self.process_boxes(bounding_boxes)
+
+        # Atualiza a tela com os sprites
+        if self.dirty_renderer:
+            self.dirty_renderer.render(self.sprites)  # Só as regiões que mudaram
+        else:
+            self.screen.fill((0, 0, 0))  # Limpar a tela
             for sprite in self.sprites:
                 sprite.draw(self.screen)
 
             pygame.display.flip()  # Atualizar a tela
 
-            # Tocar ou parar a música conforme a presença de sprites
-            visible_sprites = [s for s in self.sprites if s.images] 
-            if visible_sprites:
-                if not pygame.mixer.music.get_busy():
-                    pygame.mixer.music.play(-1)  # Tocar música em loop
-            else:
-                if pygame.mixer.music.get_busy():
-                    pygame.mixer.music.stop()  # Parar música
-
-            time.sleep(self.intervalo)
+        # Contar sprites visíveis (com imagens)
+        visible_sprites = [s for s in self.sprites if s.images]
+        if visible_sprites:
+            if not pygame.mixer.music.get_busy():
+                pygame.mixer.music.play(-1)  # Tocar música em loop
+        else:
+            if pygame.mixer.music.get_busy():
+                pygame.mixer.music.stop()  # Parar música
 
     def display(self):
-        """Função para exibir as imagens usando Pygame."""        
+        """Laço único de quadros, na thread principal: eventos, composição e flip uma vez por quadro."""
         running = True
-        
-        # Aguarde até que a conexão seja estabelecida
+
         while not self.connected:
             time.sleep(0.1)
 
@@ -223,13 +255,15 @@ class ImageFiller:
                 if event.type == pygame.QUIT:
                     running = False
                 if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q:  # Sair ao pressionar 'q'
+                    if event.key == pygame.K_q:
                         running = False
-                        pygame.mixer.music.stop()  # Parar a música
-                        pygame.quit()
-                        break
+                    elif event.key == pygame.K_s:
+                        click.echo(f"Tela: {self.clock.stats()} Quadros: {self.mailbox.stats()}")
+
+            self.render_frame()
+            self.clock.tick()
 
-            time.sleep(self.intervalo)
+        pygame.quit()
 
 
 if __name__ == "__main__":
@@ -241,10 +275,6 @@ if __name__ == "__main__":
     serial_thread = threading.Thread(target=filler.update, args=("COM11", 921600), daemon=True)
     serial_thread.start()
 
-    # Iniciar a thread que preenche os sprites
-    filler_thread = threading.Thread(target=filler.fill, daemon=True)
-    filler_thread.start()
-
     # Exibir as imagens
     filler.display()
 
@@ -1,12 +1,17 @@
-import os
 import random
 import time
 import threading
 import pygame
 import click
 from PIL import Image, ImageFilter
-from sscma.micro.client import SerialClient
 from sscma.micro.device import Device
+from serial_ingest import BlockingSerialClient
+from boleto_cache import BoletoCache, MEMORIA_PADRAO
+from dirty_renderer import DirtyRenderer
+from frame_clock import FrameClock
+from frame_mailbox import FrameMailbox
+from spatial_index import RectIndex
+from sprite_bank import BOLETOS_PADRAO, ROTACAO_PADRAO, SpriteBank
 
 
 class BoundingBoxSprite(pygame.sprite.Sprite):
@@ -48,15 +53,17 @@ class BoundingBoxSprite(pygame.sprite.Sprite):
 
 
 class ImageFiller:
-    def __init__(self, pasta_imagens, music_file):
+    def __init__(self, pasta_imagens, music_file, memoria_cache=MEMORIA_PADRAO, dirty_rects=False,
+                 banco_boletos=BOLETOS_PADRAO, banco_rotacao=ROTACAO_PADRAO):
         # Inicializar atributos
         self.fps = 30
         self.pasta_imagens = pasta_imagens
-        self.imagens = [os.path.join(pasta_imagens, img) for img in os.listdir(pasta_imagens) if img.endswith('.png')]
         self.intervalo = 1 / self.fps
         self.stop_thread = False
         self.connected = False  # Sinalizador para indicar se a conexão foi estabelecida
         self.sprites = pygame.sprite.Group()  # Grupo de sprites
+        self.mailbox = FrameMailbox()  # Último conjunto de caixas recebido da serial
+        self.clock = FrameClock(self.fps)  # Ritmo dos quadros e estatísticas de tempo
         
         # Inicializar o Pygame
         pygame.init()
@@ -65,9 +72,20 @@ class ImageFiller:
 
         # Detectar a resolução da tela
         self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)  # Tela cheia
+        # Opcional: redesenhar só as regiões onde os sprites mudaram
+        self.dirty_renderer = DirtyRenderer(self.screen) if dirty_rects else None
         self.screen_info = pygame.display.Info()
         self.rect_w = self.screen_info.current_w #NTSC 720
         self.rect_h = self.screen_info.current_h #NTSC 480
+
+        # Decodificar os boletos uma única vez, já limitados à altura da tela
+        self.boletos = BoletoCache(pasta_imagens, memoria_max=memoria_cache, altura_max=self.rect_h)
+        self.imagens = self.boletos.caminhos
+
+        # Variantes pré-renderizadas (escala × ângulo), geradas em segundo plano
+        # banco_boletos boletos ficam prontos por vez (~35 MB cada); a cada banco_rotacao
+        # segundos um deles é trocado pelo próximo, para que todos os boletos apareçam
+        self.banco = SpriteBank(self.boletos, self.create_shadow, max_boletos=banco_boletos, rotacao=banco_rotacao)
         
         # Carregar a música
         pygame.mixer.music.load(music_file)
@@ -75,57 +93,23 @@ class ImageFiller:
     def update(self, port, baudrate):
         """Conecta à porta serial e atualiza as bounding boxes."""
         try:
-            client = SerialClient(port, baudrate)
+            # Só as caixas interessam: o campo "image" é descartado ainda nos bytes
+            client = BlockingSerialClient(port, baudrate, boxes_only=True)
             device = Device(client)
 
             def on_monitor(device, msg):
-                data = msg
                 # Obter a resolução da câmera
-                self.camera_res = data.get("resolution", (240, 240))
+                self.camera_res = msg.get("resolution", (240, 240))
                 self.camera_width, self.camera_height = self.camera_res
 
-                # Remover chaves desnecessárias
-                keys_to_remove = ["image", "count", "perf", "resolution", "rotate"]
-                for key in keys_to_remove:
-                    data.pop(key, None)
-
-                if "boxes" in data:
-                    bounding_boxes = data["boxes"]
-
-                    for box in bounding_boxes:
-                        if box != []:
-                            # Extrair as dimensões da bounding box: x, y, w, h, score, target_id
-                            x, y, w, h, score, target = box
-
-                            # Ajustar a posição da bounding box com o offset horizontal e vertical
-                            x += self.offset
-                            y += self.vertical_offset  # Aplicar o offset vertical
-
-                            # Verifica se o sprite já existe, caso contrário cria um novo
-                            sprite = next((s for s in self.sprites if s.rect.colliderect((x, y, w, h))), None)
-                            if not sprite:
-                                sprite = BoundingBoxSprite(x, y, w, h)
-                                self.sprites.add(sprite)
-
-                            # Criar a imagem e a sombra do sprite
-                            sprite_image, shadow = self.create_sprite_image(w, h)
-                            sprite.add_image(sprite_image, shadow)
-                            sprite.update(x, y, w, h)
-
-                    # Remover sprites que não estão mais sendo detectados
-                    for sprite in list(self.sprites):  # Converter para lista para permitir remoção durante a iteração
-                        if not any(sprite.rect.colliderect((box[2] + self.offset, box[3] + self.vertical_offset, box[0], box[1])) 
-                                   for box in bounding_boxes if box != []):
-                            if sprite.images:
-                                sprite.images.pop(0)
-                                sprite.shadows.pop(0)
-                            if not sprite.images:
-                                self.sprites.remove(sprite)
+                # Só guardar as caixas: o quadro mais novo substitui o que ainda não foi processado
+                if "boxes" in msg:
+                    self.mailbox.put(msg["boxes"])
 
             def on_connect(device):
                 click.echo("Device connected")
                 self.connected = True  # Atualiza o sinalizador de conexão
-                device.Invoke(-1)
+                device.Invoke(-1, False, False)  # Pedir ao dispositivo que não envie as imagens
 
             def on_disconnect(device):
                 click.echo("Device disconnected")
@@ -153,9 +137,47 @@ class ImageFiller:
         except Exception as e:
             click.echo("Error: {}".format(e))
 
+    def process_boxes(self, bounding_boxes):
+        """Associa as bounding boxes do quadro mais recente aos sprites."""
+        # Índices reconstruídos a cada quadro: as colisões são testadas em C, não num laço em Python
+        sprite_index = RectIndex((s.rect, s) for s in self.sprites)
+        box_index = RectIndex()
+
+        for box in bounding_boxes:
+            if box != []:
+                # Extrair as dimensões da bounding box: x, y, w, h, score, target_id
+                x, y, w, h, score, target = box
+
+                # Ajustar a posição da bounding box com o offset horizontal e vertical
+                x += self.offset
+                y += self.vertical_offset  # Aplicar o offset vertical
+                box_index.insert((x, y, w, h))
+
+                # Verifica se o sprite já existe, caso contrário cria um novo
+                sprite = sprite_index.first((x, y, w, h))
+                if not sprite:
+                    sprite = BoundingBoxSprite(x, y, w, h)
+                    self.sprites.add(sprite)
+                    sprite_index.insert(sprite.rect, sprite)
+
+                # Criar a imagem e a sombra do sprite
+                sprite_image, shadow = self.create_sprite_image(w, h)
+                sprite.add_image(sprite_image, shadow)
+                sprite.update(x, y, w, h)
+
+        # Remover sprites que não estão mais sendo detectados
+        for sprite in list(self.sprites):  # Converter para lista para permitir remoção durante a iteração
+            if not box_index.any(sprite.rect):
+                if sprite.images:
+                    sprite.images.pop(0)
+                    sprite.shadows.pop(0)
+                if not sprite.images:
+                    self.sprites.remove(sprite)
+
     def stop(self):
         """Encerra as threads."""
         self.stop_thread = True
+        self.banco.stop()
 
     def create_shadow(self, img, angle):
         """Cria uma sombra para a imagem rotacionada."""
@@ -178,9 +200,13 @@ class ImageFiller:
         scaled_w = int(w * scale_factor)
         scaled_h = int(h * scale_factor)
 
+        # Usar uma variante pré-renderizada quando o banco já tiver essa escala
+        variante = self.banco.get(scaled_h)
+        if variante is not None:
+            return variante
+
         # Escolher uma imagem aleatória da pasta
-        img_path = random.choice(self.imagens)
-        imagem = Image.open(img_path).convert('RGBA')
+        imagem = self.boletos.random()
 
         # Manter a proporção da imagem original ao redimensionar
         aspect_ratio = imagem.width / imagem.height
@@ -199,30 +225,37 @@ class ImageFiller:
 
         return pygame.image.fromstring(imagem.tobytes(), imagem.size, imagem.mode), pygame.image.fromstring(shadow.tobytes(), shadow.size, shadow.mode)
 
-    def fill(self):
-        """Função que preenche a tela com imagens sobrepostas."""
-        while not self.stop_thread:
-            self.screen.fill((0, 0, 0))  # Limpar a tela
+    def render_frame(self):
+        """Compõe um quadro: caixas mais recentes, sprites, flip e estado da música."""
+        # convert_alpha das variantes do banco sorteadas desde o último quadro (thread principal)
+        self.banco.converter_pendentes()
 
-            # Desenhar todos os sprites
+        # Processar só o conjunto de caixas mais recente
+        bounding_boxes = self.mailbox.get_nowait()
+        if bounding_boxes is not None:
+            self.process_boxes(bounding_boxes)
+
+        # Atualiza a tela com os sprites
+        if self.dirty_renderer:
+            self.dirty_renderer.render(self.sprites)  # Só as regiões que mudaram
+        else:
+            self.screen.fill((0, 0, 0))  # Limpar a tela
             for sprite in self.sprites:
                 sprite.draw(self.screen)
 
             pygame.display.flip()  # Atualizar a tela
 
-            # Contar sprites visíveis (com imagens)
-            visible_sprites = [s for s in self.sprites if s.images]
-            if visible_sprites:
-                if not pygame.mixer.music.get_busy():
-                    pygame.mixer.music.play(-1)  # Tocar música em loop
-            else:
-                if pygame.mixer.music.get_busy():
-                    pygame.mixer.music.stop()  # Parar música
-
-            time.sleep(self.intervalo)
+        # Contar sprites visíveis (com imagens)
+        visible_sprites = [s for s in self.sprites if s.images]
+        if visible_sprites:
+            if not pygame.mixer.music.get_busy():
+                pygame.mixer.music.play(-1)  # Tocar música em loop
+        else:
+            if pygame.mixer.music.get_busy():
+                pygame.mixer.music.stop()  # Parar música
 
     def display(self):
-        """Função para exibir as imagens usando Pygame."""
+        """Laço único de quadros, na thread principal: eventos, composição e flip uma vez por quadro."""
         running = True
 
         while not self.connected:
@@ -242,24 +275,11 @@ class ImageFiller:
                     elif event.key == pygame.K_DOWN:
                         self.vertical_offset += 10  # Ajustar conforme necessário
                         click.echo(f"Vertical offset ajustado para: {self.vertical_offset}")
+                    elif event.key == pygame.K_s:
+                        click.echo(f"Tela: {self.clock.stats()} Quadros: {self.mailbox.stats()}")
 
-            # Atualiza a tela com os sprites
-            self.screen.fill((0, 0, 0))  # Limpar a tela
-            for sprite in self.sprites:
-                sprite.draw(self.screen)
-
-            pygame.display.flip()  # Atualizar a tela
-
-            # Contar sprites visíveis (com imagens)
-            visible_sprites = [s for s in self.sprites if s.images]
-            if visible_sprites:
-                if not pygame.mixer.music.get_busy():
-                    pygame.mixer.music.play(-1)  # Tocar música em loop
-            else:
-                if pygame.mixer.music.get_busy():
-                    pygame.mixer.music.stop()  # Parar música
-
-            time.sleep(self.intervalo)
+            self.render_frame()
+            self.clock.tick()
 
         pygame.quit()
 
@@ -275,10 +295,6 @@ if __name__ == "__main__":
     # serial_thread = threading.Thread(target=filler.update, args=("/dev/ttyACM0", 921600), daemon=True)
     serial_thread.start()
 
-    # Iniciar a thread que preenche os sprites
-    filler_thread = threading.Thread(target=filler.fill, daemon=True)
-    filler_thread.start()
-
     # Exibir as imagens
     filler.display()
 
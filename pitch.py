@@ -0,0 +1,159 @@
+import numpy as np
+
+NOTE_NAMES = np.array(['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B'])
+A4 = 440  # Hz
+C0 = A4 * 2**(-4.75)
+
+FMIN = 27.5  # Hz (A0)
+FMAX = 4186.0  # Hz (C8)
+
+
+def frequencies_to_notes(freqs):
+    """Nome da nota ('A4', 'C#5'...) de cada frequência; None onde não é válida (NaN, <= 0)."""
+    freqs = np.asarray(freqs, dtype=np.float64)
+    validas = np.isfinite(freqs) & (freqs > 0)
+    h = np.zeros(freqs.shape, dtype=np.int64)
+    h[validas] = np.rint(12 * np.log2(freqs[validas] / C0))
+    octave = h // 12
+    names = np.char.add(NOTE_NAMES[h % 12], octave.astype(str))
+    return [str(name) if ok else None for name, ok in zip(names, validas)]
+
+
+def _parabola(y, k):
+    """Deslocamento (-0.5..0.5) do pico em k pela parábola nos vizinhos k-1, k, k+1."""
+    linhas = np.arange(len(k))
+    k = np.clip(k, 1, y.shape[1] - 2)
+    a, b, c = y[linhas, k - 1], y[linhas, k], y[linhas, k + 1]
+    denominador = a - 2 * b + c
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = np.where(denominador != 0, 0.5 * (a - c) / denominador, 0.0)
+    return k, np.clip(p, -0.5, 0.5)
+
+
+def _espectro(frames):
+    window = np.hanning(frames.shape[1]).astype(np.float32)
+    return np.abs(np.fft.rfft(frames * window, axis=1)) ** 2
+
+
+def _faixa(n_fft, sr, fmin, fmax, n_bins):
+    primeiro = max(1, int(np.ceil(fmin * n_fft / sr)))
+    ultimo = min(n_bins - 1, int(fmax * n_fft / sr) + 1)
+    return primeiro, ultimo
+
+
+def _concentracao(potencia, bins, largura=2):
+    """Fração da potência do quadro que está em volta dos ``bins`` (n, h): ~1 para um tom limpo."""
+    linhas = np.arange(len(potencia))[:, None]
+    usados = np.zeros(potencia.shape, dtype=bool)
+    for d in range(-largura, largura + 1):
+        usados[linhas, np.clip(bins + d, 0, potencia.shape[1] - 1)] = True
+    soma = np.where(usados, potencia, 0).sum(axis=1)
+    return np.clip(soma / (potencia.sum(axis=1) + 1e-20), 0.0, 1.0)
+
+
+def fft_peak(frames, sr, fmin=FMIN, fmax=FMAX):
+    """Maior pico do espectro, refinado por interpolação parabólica no log da potência.
+
+    Rápido, mas escolhe um harmônico sempre que ele for mais forte que a fundamental.
+    Confiança: fração da potência em volta do pico.
+    """
+    n_fft = frames.shape[1]
+    potencia = _espectro(frames)
+    primeiro, ultimo = _faixa(n_fft, sr, fmin, fmax, potencia.shape[1])
+    k = np.argmax(potencia[:, primeiro:ultimo], axis=1) + primeiro
+    k, p = _parabola(np.log(potencia + 1e-20), k)
+    return (k + p) * sr / n_fft, _concentracao(potencia, k[:, None])
+
+
+def hps(frames, sr, fmin=FMIN, fmax=FMAX, harmonicos=4, minimo_relativo=1e-2):
+    """Harmonic Product Spectrum: produto do espectro comprimido por 1..``harmonicos``.
+
+    A fundamental é o único bin reforçado por todos os harmônicos, então o
+    argmax deixa de cair no 2º ou 3º harmônico. Em tons quase puros o produto
+    tende a uma oitava abaixo; por isso vale o primeiro múltiplo do candidato
+    com pelo menos ``minimo_relativo`` da potência do maior pico. Confiança:
+    fração da potência nos harmônicos da fundamental escolhida.
+    """
+    n_fft = frames.shape[1]
+    potencia = _espectro(frames)
+    n = potencia.shape[1] // harmonicos
+    log_potencia = np.log(potencia + 1e-20)
+    produto = log_potencia[:, :n].copy()  # Soma de logs = log do produto, sem underflow
+    for h in range(2, harmonicos + 1):
+        # O h-ésimo harmônico de um bin fracionário pode cair até h/2 bins longe de h*i
+        bins = np.arange(n) * h
+        raio = h // 2
+        produto += np.max([log_potencia[:, np.clip(bins + d, 0, potencia.shape[1] - 1)]
+                           for d in range(-raio, raio + 1)], axis=0)
+    primeiro, ultimo = _faixa(n_fft, sr, fmin, fmax, n)
+    k = np.argmax(produto[:, primeiro:ultimo], axis=1) + primeiro
+
+    # Correção de oitava: potência (máxima em ±1 bin) em cada múltiplo do candidato
+    linhas = np.arange(len(k))[:, None]
+    multiplos = np.arange(1, harmonicos + 1)
+    bins = np.clip(k[:, None] * multiplos, 1, potencia.shape[1] - 2)
+    vizinhos = np.maximum(np.maximum(potencia[linhas, bins - 1], potencia[linhas, bins]), potencia[linhas, bins + 1])
+    fortes = vizinhos >= minimo_relativo * potencia.max(axis=1, keepdims=True)
+    m = multiplos[np.argmax(fortes, axis=1)]  # Algum múltiplo é sempre forte: o do maior pico
+    # Leva ao máximo do lóbulo principal (±2 bins com a janela de Hann)
+    k = k * m
+    k = k + np.argmax(np.stack([potencia[linhas[:, 0], np.clip(k + d, 0, potencia.shape[1] - 1)]
+                                for d in range(-2, 3)], axis=1), axis=1) - 2
+    k, p = _parabola(log_potencia, k)
+    bins = np.rint((k + p)[:, None] * np.arange(1, harmonicos + 1)).astype(np.int64)
+    return (k + p) * sr / n_fft, _concentracao(potencia, bins)
+
+
+def yin(frames, sr, fmin=FMIN, fmax=FMAX, limiar=0.15):
+    """YIN (de Cheveigné & Kawahara): primeiro mínimo da diferença média normalizada.
+
+    A função diferença de todos os quadros sai de uma correlação por FFT. O
+    período é o primeiro mínimo local abaixo de ``limiar`` (ou o mínimo global),
+    refinado por parábola. Confiança: 1 - diferença normalizada no período.
+    """
+    n = frames.shape[1]
+    tau_min = max(2, int(sr / fmax))
+    tau_max = min(int(np.ceil(sr / fmin)), n // 2)
+    w = n - tau_max  # Janela de integração
+
+    x = frames.astype(np.float64)
+    n_fft = 1 << int(np.ceil(np.log2(n + w)))
+    r = np.fft.irfft(np.fft.rfft(x, n_fft) * np.conj(np.fft.rfft(x[:, :w], n_fft)), n_fft)[:, :tau_max + 1]
+    quadrados = np.concatenate([np.zeros((len(x), 1)), np.cumsum(x * x, axis=1)], axis=1)
+    energia_0 = quadrados[:, w:w + 1]
+    taus = np.arange(tau_max + 1)
+    energia_tau = quadrados[:, taus + w] - quadrados[:, taus]
+    d = np.maximum(energia_0 + energia_tau - 2 * r, 0)
+
+    # Diferença média normalizada cumulativa: d'(0) = 1, d'(t) = d(t) * t / soma(d[1..t])
+    acumulado = np.cumsum(d[:, 1:], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalizada = np.ones_like(d)
+        normalizada[:, 1:] = np.where(acumulado > 0, d[:, 1:] * taus[1:] / acumulado, 1.0)
+
+    faixa = normalizada[:, tau_min:tau_max]
+    minimo_local = np.zeros(faixa.shape, dtype=bool)
+    minimo_local[:, 1:-1] = (faixa[:, 1:-1] <= faixa[:, :-2]) & (faixa[:, 1:-1] <= faixa[:, 2:])
+    candidatos = minimo_local & (faixa < limiar)
+    tem = candidatos.any(axis=1)
+    tau = np.where(tem, np.argmax(candidatos, axis=1), np.argmin(faixa, axis=1)) + tau_min
+
+    tau, p = _parabola(normalizada, tau)
+    confianca = 1 - normalizada[np.arange(len(tau)), tau]
+    return sr / (tau + p), np.clip(confianca, 0.0, 1.0)
+
+
+ESTIMADORES = {
+    'fft': fft_peak,
+    'hps': hps,
+    'yin': yin,
+}
+
+
+def estimate(frames, sr, metodo='yin', fmin=FMIN, fmax=FMAX, **kwargs):
+    """Frequência (Hz) e confiança (0..1) de cada quadro (n, frame_length) pelo ``metodo`` escolhido."""
+    try:
+        estimador = ESTIMADORES[metodo]
+    except KeyError:
+        raise ValueError(f"Estimador desconhecido: {metodo!r} (use {', '.join(ESTIMADORES)})")
+    return estimador(np.asarray(frames, dtype=np.float32), sr, fmin=fmin, fmax=fmax, **kwargs)
@@ -0,0 +1,128 @@
+import os
+import struct
+import click
+import numpy as np
+from PIL import Image
+from boleto_manifest import list_boletos
+
+# Cabeçalho fixo de 32 bytes: mágica, versão, flags, largura, altura e folga.
+# Os pixels começam logo depois, em RGBA (ou RGBA pré-multiplicado), linha a linha.
+MAGICA = b"BRGBA\0"
+VERSAO = 1
+CABECALHO = struct.Struct("<6sBBII14x")
+FLAG_PREMULTIPLICADO = 1
+
+
+def raw_path(caminho):
+    """Arquivo cru correspondente a um PNG: boleto_1_1.png -> boleto_1_1.rgba."""
+    return os.path.splitext(caminho)[0] + ".rgba"
+
+
+def atualizado(caminho):
+    """Se existe um arquivo cru mais novo que o PNG."""
+    try:
+        return os.stat(raw_path(caminho)).st_mtime_ns >= os.stat(caminho).st_mtime_ns
+    except OSError:
+        return False
+
+
+def premultiplicar(pixels):
+    """RGBA -> RGBA pré-multiplicado (cor * alfa / 255, arredondado), no lugar."""
+    alpha = pixels[:, :, 3:].astype(np.uint16)
+    cor = pixels[:, :, :3] * alpha
+    cor += 127
+    cor //= 255
+    pixels[:, :, :3] = cor
+    return pixels
+
+
+def write_raw(caminho, premultiplicado=False):
+    """Converte um PNG para o formato cru, ao lado dele. Retorna o caminho gravado."""
+    with Image.open(caminho) as img:
+        pixels = np.asarray(img.convert("RGBA")).copy()
+    if premultiplicado:
+        premultiplicar(pixels)
+    altura, largura = pixels.shape[:2]
+    flags = FLAG_PREMULTIPLICADO if premultiplicado else 0
+
+    destino = raw_path(caminho)
+    with open(destino + ".tmp", "wb") as f:
+        f.write(CABECALHO.pack(MAGICA, VERSAO, flags, largura, altura))
+        f.write(pixels.tobytes())
+    os.replace(destino + ".tmp", destino)
+    return destino
+
+
+def read_header(caminho_raw):
+    """(largura, altura, premultiplicado) de um arquivo cru."""
+    with open(caminho_raw, "rb") as f:
+        magica, versao, flags, largura, altura = CABECALHO.unpack(f.read(CABECALHO.size))
+    if magica != MAGICA or versao != VERSAO:
+        raise ValueError(f"{caminho_raw} não é um arquivo RGBA cru válido")
+    return largura, altura, bool(flags & FLAG_PREMULTIPLICADO)
+
+
+def load_raw(caminho):
+    """Arquivo cru do boleto como ``np.memmap`` (altura, largura, 4) somente leitura.
+
+    Retorna (pixels, premultiplicado), ou None se não houver arquivo cru atualizado.
+    """
+    if not atualizado(caminho):
+        return None
+    largura, altura, premultiplicado = read_header(raw_path(caminho))
+    pixels = np.memmap(raw_path(caminho), dtype=np.uint8, mode="r", offset=CABECALHO.size,
+                       shape=(altura, largura, 4))
+    return pixels, premultiplicado
+
+
+def load_image(caminho):
+    """``PIL.Image`` RGBA do boleto: sobre o arquivo cru sem cópia, ou decodificando o PNG."""
+    raw = load_raw(caminho)
+    if raw is None:
+        with Image.open(caminho) as img:
+            return img.convert("RGBA")
+    pixels, premultiplicado = raw
+    altura, largura = pixels.shape[:2]
+    if premultiplicado:
+        # O PIL sabe desfazer a pré-multiplicação ("RGBa" -> "RGBA"), com cópia
+        return Image.frombuffer("RGBa", (largura, altura), pixels, "raw", "RGBa", 0, 1).convert("RGBA")
+    return Image.frombuffer("RGBA", (largura, altura), pixels, "raw", "RGBA", 0, 1)
+
+
+def load_array(caminho):
+    """Pixels RGBA (altura, largura, 4), sem pré-multiplicação. Sem cópia quando possível."""
+    raw = load_raw(caminho)
+    if raw is not None and not raw[1]:
+        return raw[0]
+    return np.asarray(load_image(caminho))
+
+
+def load_surface(caminho):
+    """``pygame.Surface`` do boleto e se deve ser desenhada com BLEND_PREMULTIPLIED.
+
+    Sobre o arquivo cru, a Surface não copia os pixels (não desenhe nela).
+    """
+    import pygame
+    raw = load_raw(caminho)
+    if raw is None:
+        return pygame.image.load(caminho), False
+    pixels, premultiplicado = raw
+    altura, largura = pixels.shape[:2]
+    return pygame.image.frombuffer(pixels, (largura, altura), "RGBA"), premultiplicado
+
+
+@click.command()
+@click.argument("pasta", default="images_png", type=click.Path(exists=True, file_okay=False))
+@click.option("--premultiplicado", is_flag=True, help="Grava a cor já multiplicada pelo alfa.")
+@click.option("--force", is_flag=True, help="Converte também os que já estão atualizados.")
+def main(pasta, premultiplicado, force):
+    """Converte os PNGs da PASTA para RGBA cru (.rgba), carregável com mmap."""
+    caminhos = [c for c in list_boletos(pasta) if force or not atualizado(c)]
+    with click.progressbar(caminhos, label="Convertendo") as barra:
+        for caminho in barra:
+            write_raw(caminho, premultiplicado)
+    click.echo(f"{len(caminhos)} convertidos")
+
+
+if __name__ == "__main__":
+    main()
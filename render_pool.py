@@ -0,0 +1,100 @@
+import queue
+import threading
+import time
+
+
+class RenderPool:
+    """Threads que geram as imagens dos sprites fora do callback do sscma.
+
+    O callback só enfileira (sprite, w, h). Os workers chamam ``render(w, h)`` e
+    deixam o resultado em outra fila, que a thread principal esvazia com ``drain()``.
+    A fila de pedidos é limitada: quando enche, o pedido mais antigo é descartado,
+    e pedidos que esperaram mais que ``max_idade`` segundos são ignorados.
+    """
+
+    def __init__(self, render, workers=2, max_fila=8, max_idade=0.25):
+        self.render = render  # Função (w, h) -> (imagem, sombra)
+        self.max_idade = max_idade
+        self.jobs = queue.Queue(maxsize=max_fila)
+        self.resultados = queue.Queue()
+        self.stop_thread = False
+
+        # Estatísticas
+        self.enfileirados = 0
+        self.descartados = 0
+        self.renderizados = 0
+        self.latencia_media = 0.0  # Segundos, média móvel exponencial
+        self.latencia_max = 0.0
+        self._lock = threading.Lock()
+
+        self.threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, sprite, w, h):
+        """Enfileira um pedido de renderização, descartando o mais antigo se a fila estiver cheia."""
+        job = (time.monotonic(), sprite, w, h)
+        while True:
+            try:
+                self.jobs.put_nowait(job)
+                break
+            except queue.Full:
+                try:
+                    self.jobs.get_nowait()
+                    with self._lock:
+                        self.descartados += 1
+                except queue.Empty:
+                    pass
+        with self._lock:
+            self.enfileirados += 1
+
+    def _worker(self):
+        while not self.stop_thread:
+            try:
+                inicio, sprite, w, h = self.jobs.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            # Pedido velho demais: a caixa já mudou, não vale a pena renderizar
+            if time.monotonic() - inicio > self.max_idade:
+                with self._lock:
+                    self.descartados += 1
+                continue
+
+            try:
+                imagem, sombra = self.render(w, h)
+            except Exception as e:
+                print(f"Erro ao renderizar sprite: {e}")
+                continue
+            self.resultados.put((sprite, imagem, sombra))
+
+            latencia = time.monotonic() - inicio
+            with self._lock:
+                self.renderizados += 1
+                self.latencia_media += 0.1 * (latencia - self.latencia_media)
+                self.latencia_max = max(self.latencia_max, latencia)
+
+    def drain(self):
+        """Retorna todos os resultados prontos como lista de (sprite, imagem, sombra)."""
+        prontos = []
+        while True:
+            try:
+                prontos.append(self.resultados.get_nowait())
+            except queue.Empty:
+                return prontos
+
+    def stats(self):
+        """Profundidade da fila, contadores e latência de renderização (ms)."""
+        with self._lock:
+            return {
+                "fila": self.jobs.qsize(),
+                "enfileirados": self.enfileirados,
+                "descartados": self.descartados,
+                "renderizados": self.renderizados,
+                "latencia_media_ms": round(self.latencia_media * 1000, 1),
+                "latencia_max_ms": round(self.latencia_max * 1000, 1),
+            }
+
+    def stop(self):
+        """Encerra os workers."""
+        self.stop_thread = True
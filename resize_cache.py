@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+import cv2
+from raw_assets import atualizado, load_array
+
+MEMORIA_PADRAO = 128 * 1024 * 1024  # Orçamento padrão de memória (128 MB)
+
+
+class ResizeCache:
+    """Boletos já redimensionados, indexados por (caminho, largura, altura), com descarte LRU.
+
+    Os tamanhos são arredondados para múltiplos de ``passo`` pixels: uma pessoa
+    parada cuja caixa oscila alguns pixels continua usando a mesma versão, sem
+    chamar ``cv2.resize`` a cada quadro. Os originais decodificados ficam no mesmo
+    orçamento de memória, para que um redimensionamento novo não leia o PNG de novo.
+    """
+
+    def __init__(self, memoria_max=MEMORIA_PADRAO, passo=8, atlas=None):
+        self.memoria_max = memoria_max
+        self.passo = passo
+        self.atlas = atlas  # Atlas opcional: originais sem decodificar PNG
+        self.memoria_usada = 0
+        self.hits = 0
+        self.misses = 0
+        self._imagens = OrderedDict()  # (caminho, largura, altura) -> array; original com tamanho None
+        self._lock = threading.Lock()
+
+    def _quantizar(self, valor):
+        return max(self.passo, round(valor / self.passo) * self.passo)
+
+    def _guardar(self, chave, imagem):
+        with self._lock:
+            if chave not in self._imagens:
+                self._imagens[chave] = imagem
+                self.memoria_usada += imagem.nbytes
+            while self.memoria_usada > self.memoria_max and len(self._imagens) > 1:
+                _, antiga = self._imagens.popitem(last=False)
+                self.memoria_usada -= antiga.nbytes
+
+    def _buscar(self, chave):
+        with self._lock:
+            imagem = self._imagens.get(chave)
+            if imagem is not None:
+                self._imagens.move_to_end(chave)
+            return imagem
+
+    def original(self, caminho):
+        """Imagem decodificada com o canal alfa (se houver)."""
+        chave = (caminho, None, None)
+        imagem = self._buscar(chave)
+        if imagem is None:
+            if self.atlas is not None and caminho in self.atlas:
+                imagem = cv2.cvtColor(self.atlas.array(caminho), cv2.COLOR_RGBA2BGRA)
+            elif atualizado(caminho):
+                imagem = cv2.cvtColor(load_array(caminho), cv2.COLOR_RGBA2BGRA)  # Arquivo .rgba cru
+            else:
+                imagem = cv2.imread(caminho, cv2.IMREAD_UNCHANGED)
+            self._guardar(chave, imagem)
+        return imagem
+
+    def get(self, caminho, largura, altura):
+        """Boleto redimensionado para aproximadamente (largura, altura). Não altere no lugar."""
+        chave = (caminho, self._quantizar(largura), self._quantizar(altura))
+        imagem = self._buscar(chave)
+        if imagem is not None:
+            self.hits += 1
+            return imagem
+
+        self.misses += 1
+        imagem = cv2.resize(self.original(caminho), chave[1:], interpolation=cv2.INTER_AREA)
+        self._guardar(chave, imagem)
+        return imagem
+
+    def stats(self):
+        """Acertos, faltas e memória ocupada."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "itens": len(self._imagens),
+            "memoria_mb": round(self.memoria_usada / 1024 / 1024, 1),
+        }
@@ -0,0 +1,132 @@
+import re
+from collections import Counter
+
+DURACOES = (1, 2, 4, 8, 16, 32)  # Frações da semibreve aceitas pelo RTTTL
+OITAVA_MIN, OITAVA_MAX = 4, 7  # Faixa de oitavas da especificação RTTTL
+BPM_PADRAO = 100
+
+_NOTA = re.compile(r'^([A-Ga-g]#?)(-?\d+)$')
+
+
+def clamp_note(note):
+    """'F10' -> ('f', 7): nome em minúsculas e oitava limitada à faixa do RTTTL."""
+    m = _NOTA.match(note)
+    if m is None:
+        raise ValueError(f"Nota inválida: {note!r}")
+    return m.group(1).lower(), min(max(int(m.group(2)), OITAVA_MIN), OITAVA_MAX)
+
+
+def quantize(segundos, bpm=BPM_PADRAO):
+    """Duração RTTTL (d, pontuada) mais próxima de ``segundos``, ou None se for curta demais.
+
+    ``d`` é a fração da semibreve (4 = semínima, que dura uma batida de ``b=``);
+    pontuada vale 1,5 vez. Menos da metade de uma fusa (d=32) não vira nota.
+    """
+    batidas = segundos * bpm / 60
+    if batidas < 4 / DURACOES[-1] / 2:
+        return None
+    opcoes = [(d, pontuada) for d in DURACOES for pontuada in (False, True) if not (pontuada and d == DURACOES[-1])]
+    return min(opcoes, key=lambda o: abs(4 / o[0] * (1.5 if o[1] else 1) - batidas))
+
+
+def format_token(token, d_padrao=4, o_padrao=5):
+    """Texto de um token (d, pontuada, nota, oitava); nota None é pausa ('p')."""
+    d, pontuada, nota, oitava = token
+    texto = '' if d == d_padrao else str(d)
+    if nota is None:
+        texto += 'p'
+    else:
+        texto += nota + ('' if oitava == o_padrao else str(oitava))
+    return texto + ('.' if pontuada else '')
+
+
+class RtttlEncoder:
+    """Junta notas quadro a quadro em tokens RTTTL com duração, conforme chegam.
+
+    Quadros seguidos com a mesma nota (depois de limitar a oitava) viram um token
+    só; None vira pausa. Trechos curtos demais para a menor duração são absorvidos
+    pela nota anterior, em vez de gerar notas espúrias. Cada token pronto é
+    entregue a ``on_token(d, pontuada, nota, oitava)``.
+    """
+
+    def __init__(self, frame_seconds, on_token, bpm=BPM_PADRAO):
+        self.frame_seconds = frame_seconds
+        self.on_token = on_token
+        self.bpm = bpm
+        self._semibreve = 4 * 60 / bpm  # Segundos da maior duração
+        self._atual = None  # (nota, oitava) do trecho sendo contado
+        self._quadros = 0
+        self._pendente = None  # [(nota, oitava), segundos] esperando o próximo trecho
+
+    def feed(self, note):
+        """Recebe a nota de um quadro ('A4', 'C#5'...) ou None para silêncio."""
+        chave = (None, None) if note is None else clamp_note(note)
+        if chave != self._atual and self._quadros:
+            self._fim_trecho()
+        self._atual = chave
+        self._quadros += 1
+
+    def close(self):
+        """Entrega o que ainda está acumulado."""
+        if self._quadros:
+            self._fim_trecho()
+        if self._pendente is not None:
+            self._emitir(*self._pendente)
+            self._pendente = None
+
+    def _fim_trecho(self):
+        chave, segundos = self._atual, self._quadros * self.frame_seconds
+        self._quadros = 0
+        if self._pendente is not None and (self._pendente[0] == chave or quantize(segundos, self.bpm) is None):
+            self._pendente[1] += segundos  # Mesma nota depois de um trecho absorvido, ou trecho curto
+            return
+        if self._pendente is not None:
+            self._emitir(*self._pendente)
+        self._pendente = [chave, segundos]
+
+    def _emitir(self, chave, segundos):
+        nota, oitava = chave
+        # Mais longo que uma semibreve pontuada: repetir semibreves
+        while segundos > self._semibreve * 1.75:
+            self.on_token(1, False, nota, oitava)
+            segundos -= self._semibreve
+        duracao = quantize(segundos, self.bpm)
+        if duracao is not None:
+            self.on_token(duracao[0], duracao[1], nota, oitava)
+
+
+class RtttlWriter:
+    """Grava RTTTL num arquivo aberto conforme os tokens ficam prontos (modo streaming)."""
+
+    def __init__(self, file, frame_seconds, name="melody", bpm=BPM_PADRAO, d_padrao=4, o_padrao=5):
+        self.file = file
+        self.d_padrao = d_padrao
+        self.o_padrao = o_padrao
+        self.tokens = 0
+        self.file.write(f"{name}:d={d_padrao},o={o_padrao},b={bpm}:")
+        self._encoder = RtttlEncoder(frame_seconds, self._escrever, bpm)
+
+    def _escrever(self, *token):
+        self.file.write((',' if self.tokens else '') + format_token(token, self.d_padrao, self.o_padrao))
+        self.tokens += 1
+
+    def write(self, note):
+        self._encoder.feed(note)
+
+    def close(self):
+        self._encoder.close()
+
+
+def to_rtttl(notes, frame_seconds, name="melody", bpm=BPM_PADRAO):
+    """RTTTL das notas quadro a quadro, com d= e o= padrão escolhidos pelos mais frequentes."""
+    tokens = []
+    encoder = RtttlEncoder(frame_seconds, lambda *token: tokens.append(token), bpm)
+    for note in notes:
+        encoder.feed(note)
+    encoder.close()
+
+    d_padrao = Counter(t[0] for t in tokens).most_common(1)[0][0] if tokens else 4
+    oitavas = Counter(t[3] for t in tokens if t[2] is not None)
+    o_padrao = oitavas.most_common(1)[0][0] if oitavas else 5
+    cabecalho = f"{name}:d={d_padrao},o={o_padrao},b={bpm}:"
+    return cabecalho + ','.join(format_token(t, d_padrao, o_padrao) for t in tokens)
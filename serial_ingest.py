@@ -0,0 +1,172 @@
+import os
+import select
+import threading
+import serial
+from sscma.micro.client import Client
+
+
+class SerialReader:
+    """Lê a serial bloqueando no descritor em vez de ficar consultando ``in_waiting``.
+
+    No Linux espera com ``select`` no fd da porta e lê em blocos grandes para um
+    buffer reaproveitado. Onde não há fd (Windows), usa a leitura com timeout do
+    pyserial, que também dorme até chegar pelo menos um byte. Em ambos os casos a
+    thread fica parada quando o dispositivo não envia nada.
+    """
+
+    def __init__(self, serial_port, on_data, chunk_size=64 * 1024, timeout=0.1):
+        self.serial_port = serial_port
+        self.on_data = on_data  # Recebe cada bloco lido (bytes), ex.: client.on_recieve
+        self.timeout = timeout  # Intervalo máximo para checar o pedido de parada
+        self.bytes_lidos = 0
+        self._parar = threading.Event()
+        self._buffer = bytearray(chunk_size)
+        self._view = memoryview(self._buffer)
+        self._thread = None
+
+    @property
+    def running(self):
+        return not self._parar.is_set()
+
+    def is_alive(self):
+        """Indica se a thread de leitura está rodando."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _fileno(self):
+        try:
+            return self.serial_port.fileno()
+        except (AttributeError, OSError, NotImplementedError):
+            return None
+
+    def _run_select(self, fd):
+        while self.running:
+            prontos, _, _ = select.select([fd], [], [], self.timeout)
+            if not prontos:
+                continue
+            try:
+                n = os.readv(fd, [self._buffer])
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                print(f"Erro ao ler a serial: {e}")
+                break
+            if n == 0:
+                break  # Dispositivo desconectado
+            self.bytes_lidos += n
+            self.on_data(bytes(self._view[:n]))
+
+    def _run_pyserial(self):
+        self.serial_port.timeout = self.timeout
+        while self.running:
+            # Bloqueia até chegar pelo menos 1 byte (ou o timeout), depois pega o que já estiver no buffer
+            msg = self.serial_port.read(max(1, self.serial_port.in_waiting))
+            if msg:
+                self.bytes_lidos += len(msg)
+                self.on_data(msg)
+
+    def run(self):
+        """Loop de leitura; roda até ``stop()`` ser chamado ou o dispositivo sumir."""
+        fd = self._fileno()
+        if fd is not None and hasattr(os, "readv"):
+            self._run_select(fd)
+        else:
+            self._run_pyserial()
+        self._parar.set()
+
+    def start(self):
+        """Inicia a leitura numa thread própria."""
+        self._parar.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Pede a parada e espera a thread terminar (no máximo um timeout)."""
+        self._parar.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(self.timeout * 5)
+        self._thread = None
+
+
+class ImageStripper:
+    """Remove o conteúdo do campo "image" dos bytes da serial antes do parse JSON.
+
+    O JPEG em base64 é de longe a maior parte de cada mensagem do monitor. Cortá-lo
+    ainda nos bytes evita acumular, procurar e decodificar esse texto: a mensagem
+    chega ao sscma com ``"image":""``. Funciona mesmo com o campo dividido entre
+    vários blocos lidos.
+    """
+
+    MARCADOR = b'"image":"'
+
+    def __init__(self, on_data):
+        self.on_data = on_data
+        self.bytes_descartados = 0
+        self._pendente = b''  # Possível início do marcador no fim do bloco anterior
+        self._dentro = False  # Se estamos no meio do base64
+
+    def _sufixo_parcial(self, data):
+        """Tamanho do maior sufixo de ``data`` que é o começo do marcador."""
+        for k in range(min(len(self.MARCADOR) - 1, len(data)), 0, -1):
+            if data.endswith(self.MARCADOR[:k]):
+                return k
+        return 0
+
+    def feed(self, data):
+        data = self._pendente + data
+        self._pendente = b''
+        saida = []
+        i = 0
+        while i < len(data):
+            if self._dentro:
+                # O base64 não tem aspas: a próxima aspa fecha o campo
+                fim = data.find(b'"', i)
+                if fim < 0:
+                    self.bytes_descartados += len(data) - i
+                    break
+                self.bytes_descartados += fim - i
+                self._dentro = False
+                i = fim
+            else:
+                inicio = data.find(self.MARCADOR, i)
+                if inicio < 0:
+                    k = self._sufixo_parcial(data)
+                    saida.append(data[i:len(data) - k])
+                    self._pendente = data[len(data) - k:]
+                    break
+                inicio += len(self.MARCADOR)
+                saida.append(data[i:inicio])
+                self._dentro = True
+                i = inicio
+
+        if saida:
+            self.on_data(b''.join(saida))
+
+
+class BlockingSerialClient(Client):
+    """Cliente sscma que lê a serial com o SerialReader, sem busy-polling.
+
+    Substitui o ``SerialClient`` do sscma. Com ``boxes_only=True`` o campo "image"
+    é cortado dos bytes antes do parse (ver ``ImageStripper``).
+    """
+
+    def __init__(self, port, baudrate=921600, timeout=0.1, boxes_only=False, **kwargs):
+        self._serial = serial.Serial(port, baudrate, timeout=timeout, **kwargs)
+        super().__init__(self._serial.write)
+
+        self.stripper = ImageStripper(self.on_recieve) if boxes_only else None
+        on_data = self.stripper.feed if self.stripper else self.on_recieve
+        self.reader = SerialReader(self._serial, on_data, timeout=timeout)
+
+    @property
+    def is_connected(self):
+        return self._serial.is_open
+
+    def loop_start(self):
+        if not self._serial.is_open:
+            self._serial.open()
+        if not self.reader.is_alive():
+            self.reader.start()
+
+    def loop_stop(self):
+        self.reader.stop()
+        self._serial.close()
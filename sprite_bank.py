@@ -0,0 +1,161 @@
+import math
+import queue
+import random
+import threading
+import pygame
+from PIL import Image
+
+ALTURAS_PADRAO = (48, 60, 75, 94, 117, 146, 183, 229)  # Alturas quantizadas (pixels da câmera), passo de 1,25x
+ANGULOS_PADRAO = tuple(range(-60, 61, 5))  # De -60° a 60°, a cada 5°
+TOLERANCIA_PADRAO = 1.12  # ~raiz do passo entre alturas: no máximo 12% fora do tamanho pedido
+# Cada boleto ocupa de ~35 a ~50 MB com as alturas e ângulos padrão (200 variantes
+# + sombras, conforme a proporção do boleto) e custa de ~0,8 a ~3 s de CPU para
+# renderizar num x86 (várias vezes isso num Orange Pi)
+BOLETOS_PADRAO = 2  # Boletos com variantes prontas ao mesmo tempo (~70 MB)
+ROTACAO_PADRAO = 120.0  # Segundos entre trocas de um boleto do banco pelo próximo (0 desliga)
+VARIANTES_POR_VEZ = 4  # Variantes renderizadas de uma vez na rotação, antes de uma pausa
+
+
+def pil_to_surface(imagem):
+    """Converte uma imagem PIL RGBA em Surface.
+
+    Não usa ``convert_alpha()``: isso acessa a tela e só pode rodar na thread principal.
+    """
+    return pygame.image.fromstring(imagem.tobytes(), imagem.size, imagem.mode)
+
+
+class SpriteBank:
+    """Banco de variantes dos boletos em escalas e ângulos fixos, com as sombras já prontas.
+
+    As variantes são geradas numa thread em segundo plano, ``max_boletos`` boletos
+    por vez: a cada ``rotacao`` segundos o boleto mais antigo do banco é trocado
+    pelo próximo do cache (em ordem embaralhada), então todos os boletos acabam
+    aparecendo sem que a memória cresça com o tamanho da pasta. Com ``rotacao``
+    0 o banco fica nos primeiros boletos sorteados.
+
+    Na rotação o próximo boleto é renderizado aos poucos, ``VARIANTES_POR_VEZ``
+    variantes e uma pausa, espalhando o trabalho por ~``rotacao`` segundos em vez de
+    tirar ~1 s de CPU (e do GIL) do laço de quadros de uma vez. Enquanto ele é
+    montado a memória chega a ``max_boletos + 1`` boletos.
+
+    As Surfaces são criadas sem ``convert_alpha()``; a thread principal converte
+    as variantes já sorteadas chamando ``converter_pendentes()`` a cada quadro.
+    """
+
+    def __init__(self, boletos, criar_sombra, alturas=ALTURAS_PADRAO, angulos=ANGULOS_PADRAO,
+                 max_boletos=BOLETOS_PADRAO, rotacao=ROTACAO_PADRAO, tolerancia=TOLERANCIA_PADRAO,
+                 background=True):
+        self.boletos = boletos  # BoletoCache com as imagens decodificadas
+        self.criar_sombra = criar_sombra  # Mesma função de sombra usada pelo ImageFiller
+        self.alturas = sorted(alturas)
+        self.angulos = tuple(angulos)
+        self.max_boletos = max(1, max_boletos)
+        self.rotacao = rotacao
+        self.tolerancia = tolerancia  # Razão máxima aceita entre a altura pedida e a do banco
+        self.memoria_usada = 0
+        self.trocas = 0
+        self.pronto = threading.Event()  # Sinaliza quando o banco inicial foi gerado
+        self._fila = []  # Próximos boletos a entrar no banco
+        self._ativos = {}  # caminho -> {altura: [[imagem, sombra, convertida], ...]}; substituído, nunca alterado
+        self._memoria = {}  # caminho -> bytes das variantes
+        self._pendentes = queue.SimpleQueue()  # Variantes sorteadas ainda sem convert_alpha
+        self._parar = threading.Event()
+
+        if background:
+            threading.Thread(target=self.build, daemon=True).start()
+        else:
+            self.build()
+
+    def __len__(self):
+        return sum(len(v) for variantes in self._ativos.values() for v in variantes.values())
+
+    def render(self, imagem, altura, angulo):
+        """Redimensiona, rotaciona e cria a sombra de um boleto, como no create_sprite_image."""
+        largura = max(1, int(altura * imagem.width / imagem.height))
+        imagem = imagem.resize((largura, altura), Image.Resampling.LANCZOS)
+        imagem = imagem.rotate(angulo, expand=True)
+        shadow = self.criar_sombra(imagem, angulo)
+        return imagem, shadow
+
+    def _proximo(self):
+        """Próximo boleto a entrar: percorre o cache inteiro embaralhado antes de repetir."""
+        if not self._fila:
+            self._fila = [c for c in self.boletos.caminhos if c not in self._ativos] or list(self.boletos.caminhos)
+            random.shuffle(self._fila)
+        return self._fila.pop()
+
+    def _ativar(self, caminho, pausa=0):
+        """Gera as variantes de um boleto e troca o mais antigo do banco por ele.
+
+        Com ``pausa`` > 0 espera esse tempo a cada ``VARIANTES_POR_VEZ`` variantes.
+        Retorna False, sem mexer no banco, se ``stop()`` for chamado no meio.
+        """
+        imagem = self.boletos.get(caminho)
+        variantes, memoria, feitas = {}, 0, 0
+        for altura in self.alturas:
+            variantes[altura] = []
+            for angulo in self.angulos:
+                img, shadow = self.render(imagem, altura, angulo)
+                variantes[altura].append([pil_to_surface(img), pil_to_surface(shadow), False])
+                memoria += (img.width * img.height + shadow.width * shadow.height) * 4
+                feitas += 1
+                if pausa and feitas % VARIANTES_POR_VEZ == 0 and self._parar.wait(pausa):
+                    return False
+
+        ativos = dict(self._ativos)
+        while len(ativos) >= self.max_boletos:
+            antigo = next(iter(ativos))
+            del ativos[antigo]
+            self.memoria_usada -= self._memoria.pop(antigo)
+            self.trocas += 1
+        ativos[caminho] = variantes
+        self._memoria[caminho] = memoria
+        self.memoria_usada += memoria
+        self._ativos = ativos  # Troca atômica: get() nunca vê o dicionário pela metade
+        return True
+
+    def build(self):
+        """Gera o banco inicial de uma vez e depois, se houver mais boletos que cabem, vai trocando."""
+        for _ in range(min(self.max_boletos, len(self.boletos.caminhos))):
+            self._ativar(self._proximo())
+        self.pronto.set()
+        if self.rotacao and len(self.boletos.caminhos) > self.max_boletos:
+            # Pausas que espalham a renderização de um boleto pelo intervalo da rotação
+            passos = math.ceil(len(self.alturas) * len(self.angulos) / VARIANTES_POR_VEZ)
+            while self._ativar(self._proximo(), pausa=self.rotacao / passos):
+                pass
+
+    def get(self, altura):
+        """Retorna um par (imagem, sombra) aleatório da altura do banco mais próxima.
+
+        Retorna None se o banco ainda estiver vazio ou se nenhuma altura estiver
+        dentro da tolerância. Pode ser chamado de qualquer thread.
+        """
+        ativos = self._ativos
+        if not ativos or altura <= 0:
+            return None
+
+        # Comparar em escala logarítmica: 50→48 é tão próximo quanto 250→240
+        mais_proxima = min(self.alturas, key=lambda a: abs(math.log(a / altura)))
+        if abs(math.log(mais_proxima / altura)) > math.log(self.tolerancia):
+            return None
+        variante = random.choice(random.choice(list(ativos.values()))[mais_proxima])
+        if not variante[2]:
+            self._pendentes.put(variante)
+        return variante[0], variante[1]
+
+    def converter_pendentes(self):
+        """Converte para o formato da tela as variantes já sorteadas. Só na thread principal."""
+        if pygame.display.get_surface() is None:
+            return
+        while True:
+            try:
+                variante = self._pendentes.get_nowait()
+            except queue.Empty:
+                return
+            if not variante[2]:
+                variante[0], variante[1], variante[2] = variante[0].convert_alpha(), variante[1].convert_alpha(), True
+
+    def stop(self):
+        """Interrompe a rotação."""
+        self._parar.set()
@@ -0,0 +1,80 @@
+import os
+import time
+import numpy as np
+import pytest
+import audio_cache
+
+
+@pytest.fixture
+def decodificacoes(monkeypatch):
+    """Troca o librosa.load por um sinal fixo e conta quantas vezes ele foi chamado."""
+    chamadas = []
+
+    def load(audio_file, sr, duration):
+        chamadas.append(audio_file)
+        return np.arange(100, dtype=np.float64) / 100, sr
+
+    monkeypatch.setattr(audio_cache.librosa, 'load', load)
+    return chamadas
+
+
+@pytest.fixture
+def audio(tmp_path):
+    caminho = tmp_path / 'musica.mp3'
+    caminho.write_bytes(b'conteudo')
+    return str(caminho)
+
+
+def test_segunda_vez_vem_do_cache(tmp_path, audio, decodificacoes):
+    pasta = str(tmp_path / 'cache')
+    y, sr = audio_cache.load(audio, pasta=pasta)
+    y2, sr2 = audio_cache.load(audio, pasta=pasta)
+    assert decodificacoes == [audio]
+    assert sr == sr2 == audio_cache.SR_PADRAO
+    assert isinstance(y2, np.memmap) and y2.dtype == np.float32
+    assert np.array_equal(y, y2)
+
+
+def test_gravacao_que_falha_nao_deixa_tmp(tmp_path, audio, decodificacoes, monkeypatch):
+    pasta = tmp_path / 'cache'
+
+    def disco_cheio(*args, **kwargs):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(audio_cache.np, 'save', disco_cheio)
+    y, sr = audio_cache.load(audio, pasta=str(pasta))
+    assert not isinstance(y, np.memmap) and y.dtype == np.float32 and len(y) == 100
+    assert sr == audio_cache.SR_PADRAO
+    assert os.listdir(pasta) == []
+
+
+def test_pasta_sem_permissao_usa_o_decodificado(tmp_path, audio, decodificacoes):
+    bloqueio = tmp_path / 'arquivo'
+    bloqueio.write_bytes(b'')  # makedirs falha: o "pai" do cache é um arquivo
+    y, _ = audio_cache.load(audio, pasta=str(bloqueio / 'cache'))
+    assert np.array_equal(y, np.arange(100, dtype=np.float32) / 100)
+
+
+def test_limitar_apaga_os_mais_antigos_e_tmp_abandonado(tmp_path):
+    agora = time.time()
+    for i, nome in enumerate(['a_22050.npy', 'b_22050.npy', 'c_22050.npy.1.tmp', 'd_22050.npy.2.tmp']):
+        caminho = tmp_path / nome
+        caminho.write_bytes(b'x' * 100)
+        if nome != 'd_22050.npy.2.tmp':  # d ainda está sendo gravado
+            os.utime(caminho, (agora - 7200 + i, agora - 7200 + i))
+
+    assert [os.path.basename(c) for c, _ in audio_cache.entradas(str(tmp_path))] == \
+        ['a_22050.npy', 'b_22050.npy', 'c_22050.npy.1.tmp']
+    assert audio_cache.limitar(str(tmp_path), tamanho_max=100) == 2
+    assert sorted(os.listdir(tmp_path)) == ['c_22050.npy.1.tmp', 'd_22050.npy.2.tmp']
+    assert audio_cache.limpar(str(tmp_path)) == 1
+    assert os.listdir(tmp_path) == ['d_22050.npy.2.tmp']
+
+
+def test_chave_muda_com_conteudo_e_parametros(audio):
+    chave = audio_cache.chave_audio(audio)
+    assert len(chave) == 32
+    assert audio_cache.chave_audio(audio, sr=44100) != chave
+    with open(audio, 'ab') as f:
+        f.write(b'!')
+    assert audio_cache.chave_audio(audio) != chave
@@ -0,0 +1,62 @@
+import os
+import pytest
+from PIL import Image
+from boleto_manifest import MANIFEST, Manifest, chave_parametros, descrever_png, list_boletos
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    """Pasta com dois PNGs registrados no manifesto."""
+    manifest = Manifest(str(tmp_path))
+    for i, tamanho in enumerate(((30, 60), (40, 60))):
+        arquivo = f'boleto_{i + 1}_1.png'
+        Image.new('RGB', tamanho, 'white').save(tmp_path / arquivo)
+        manifest.registrar(arquivo, chave_parametros(indice=i), descrever_png(manifest.caminho(arquivo)), indice=i)
+    manifest.save()
+    return tmp_path
+
+
+def test_chave_parametros():
+    assert chave_parametros(a=1, b=2) == chave_parametros(b=2, a=1)
+    assert chave_parametros(a=1) != chave_parametros(a=2)
+
+
+def test_descrever_png(pasta):
+    descricao = descrever_png(str(pasta / 'boleto_2_1.png'))
+    assert (descricao['largura'], descricao['altura'], descricao['proporcao']) == (40, 60, 40 / 60)
+    assert descricao['bytes'] == os.path.getsize(pasta / 'boleto_2_1.png')
+
+
+def test_load_e_pendentes(pasta):
+    manifest = Manifest.load(str(pasta))
+    chaves = {f'boleto_{i + 1}_1.png': chave_parametros(indice=i) for i in range(3)}
+    assert manifest.pendentes(chaves) == ['boleto_3_1.png']
+
+    chaves['boleto_1_1.png'] = chave_parametros(indice=99)  # Parâmetros mudaram
+    assert manifest.pendentes(chaves) == ['boleto_1_1.png', 'boleto_3_1.png']
+
+
+def test_conteudo_alterado_e_so_tocado(pasta):
+    manifest = Manifest.load(str(pasta))
+    chave = chave_parametros(indice=0)
+    png = pasta / 'boleto_1_1.png'
+
+    os.utime(png, ns=(0, 0))  # Só tocado: o hash confirma e o mtime é atualizado
+    assert manifest.valido('boleto_1_1.png', chave)
+    assert manifest.entradas['boleto_1_1.png']['mtime_ns'] == 0
+
+    Image.new('RGB', (30, 60), 'black').save(png)
+    assert not manifest.valido('boleto_1_1.png', chave, verificar_hash=True)
+
+
+def test_manifesto_ilegivel_comeca_vazio(pasta):
+    (pasta / MANIFEST).write_text('{')
+    assert Manifest.load(str(pasta)).entradas == {}
+
+
+def test_list_boletos(pasta):
+    (pasta / 'solto.png').write_bytes(b'')
+    os.remove(pasta / 'boleto_2_1.png')
+    assert list_boletos(str(pasta)) == [str(pasta / 'boleto_1_1.png')]  # Só o manifesto, e só o que existe
+    os.remove(pasta / MANIFEST)
+    assert list_boletos(str(pasta)) == [str(pasta / 'boleto_1_1.png'), str(pasta / 'solto.png')]
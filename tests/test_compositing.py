@@ -0,0 +1,42 @@
+import random
+import numpy as np
+from bench_overlay import gerar_overlays, referencia
+from compositing import overlay_image, overlay_images
+
+
+def test_mistura_igual_a_referencia():
+    # Mesma conferência do bench_overlay: resultado inteiro idêntico à mistura em ponto flutuante
+    for largura, altura in ((480, 480), (1920, 1080)):
+        overlays = gerar_overlays(20, largura, altura, random.Random(0))
+        esperado = np.full((altura, largura, 3), 40, dtype=np.uint8)
+        obtido = esperado.copy()
+        for img, x, y in overlays:
+            referencia(esperado, img, x, y)
+        overlay_images(obtido, overlays)
+        assert np.array_equal(esperado, obtido)
+
+
+def test_arredondamento_exato_em_todos_os_valores():
+    cor, fundo, alfa = np.meshgrid(np.arange(0, 256, 5), np.arange(0, 256, 5), np.arange(256), indexing='ij')
+    overlay = np.stack([cor.ravel()] * 3 + [alfa.ravel()], axis=1).astype(np.uint8)[None]
+    quadro = np.repeat(fundo.ravel().astype(np.uint8)[None, :, None], 3, axis=2)
+    overlay_image(quadro, overlay, 0, 0)
+    a = alfa.ravel() / 255
+    assert np.array_equal(quadro[0, :, 0], np.rint(cor.ravel() * a + fundo.ravel() * (1 - a)))
+
+
+def test_recorta_nas_bordas():
+    quadro = np.zeros((10, 10, 3), dtype=np.uint8)
+    overlay = np.full((4, 4, 4), 255, dtype=np.uint8)
+    overlay_image(quadro, overlay, -2, 8)
+    assert quadro[:, :, 0].sum() == 255 * 2 * 2
+    assert quadro[8:, :2].all()
+    overlay_image(quadro, overlay, 20, 20)  # Totalmente fora: nada muda
+    assert quadro[:, :, 0].sum() == 255 * 2 * 2
+
+
+def test_sem_alfa_copia():
+    quadro = np.zeros((10, 10, 3), dtype=np.uint8)
+    overlay_image(quadro, np.full((3, 3, 3), 7, dtype=np.uint8), 1, 1)
+    assert (quadro[1:4, 1:4] == 7).all()
+    assert quadro.sum() == 7 * 27
@@ -0,0 +1,45 @@
+import json
+import pytest
+import display_resolution
+
+
+@pytest.fixture
+def drm(tmp_path, monkeypatch):
+    """/sys/class/drm falso com um monitor 1920x1080 ligado."""
+    conector = tmp_path / "card0-HDMI-A-1"
+    conector.mkdir()
+    (conector / "modes").write_text("1920x1080\n1280x720\n")
+    (conector / "status").write_text("connected\n")
+    (conector / "edid").write_bytes(b"monitor")
+    monkeypatch.setattr(display_resolution, "DRM_PATH", str(tmp_path) + "/")
+    monkeypatch.setattr(display_resolution, "_resolucao", None)
+    monkeypatch.delenv(display_resolution.ENV_VAR, raising=False)
+    monkeypatch.delenv(display_resolution.ENV_REDETECTAR, raising=False)
+    return conector
+
+
+@pytest.mark.parametrize("driver", display_resolution.DRIVERS_SEM_TELA)
+def test_desktop_falso_do_sdl_e_ignorado(drm, tmp_path, monkeypatch, driver):
+    # Sem tela (ex.: --headless por SSH) o SDL responde 1024x768; isso não pode ir para o cache
+    monkeypatch.setenv("SDL_VIDEODRIVER", driver)
+    assert display_resolution._pygame() is None
+    assert display_resolution.detect_resolution() == ((1920, 1080), "drm")
+
+    cache = tmp_path / "cache.json"
+    assert display_resolution.get_screen_resolution(cache_path=str(cache)) == (1920, 1080)
+    assert json.loads(cache.read_text())["resolution"] == [1920, 1080]
+
+
+def test_cache_vale_so_para_o_mesmo_monitor(drm, tmp_path, monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "offscreen")
+    cache = str(tmp_path / "cache.json")
+    display_resolution.get_screen_resolution(cache_path=cache)
+    assert display_resolution._ler_cache(cache) == (1920, 1080)
+    (drm / "edid").write_bytes(b"outro monitor")
+    assert display_resolution._ler_cache(cache) is None
+
+
+def test_parse_resolution():
+    assert display_resolution.parse_resolution("1280X720") == (1280, 720)
+    with pytest.raises(ValueError):
+        display_resolution.parse_resolution("0x720")
@@ -0,0 +1,42 @@
+import os
+import numpy as np
+from find_music_notes import (FRAME_LENGTH, HOP_LENGTH, SR_PADRAO, convert_to_rtttl, dominant_frequencies,
+                              find_notes, frame_signal, stream_frequencies, stream_notes)
+
+MUSICA = os.path.join(os.path.dirname(__file__), '..', 'todoenrolado.mp3')
+
+
+def tom(freq, segundos):
+    t = np.arange(int(segundos * SR_PADRAO)) / SR_PADRAO
+    return (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def test_frame_signal_completa_o_ultimo_quadro():
+    y = np.ones(HOP_LENGTH * 3 + 10, dtype=np.float32)
+    frames = frame_signal(y)
+    assert frames.shape == (4, FRAME_LENGTH)
+    assert frames[-1, :10].all() and not frames[-1, 10:].any()
+
+
+def test_sinal_vazio_da_zero_quadros():
+    # Ex.: --duration 0 ou decodificação vazia
+    y = np.zeros(0, dtype=np.float32)
+    assert frame_signal(y).shape == (0, FRAME_LENGTH)
+    assert len(dominant_frequencies(y, SR_PADRAO)) == 0
+    assert find_notes(y, SR_PADRAO) == []
+    assert list(stream_frequencies([y], SR_PADRAO)) == []
+    assert convert_to_rtttl([], name='vazio') == 'vazio:d=4,o=5,b=100:'
+
+
+def test_streaming_igual_ao_sinal_inteiro():
+    y = np.concatenate([tom(440, 0.5), np.zeros(SR_PADRAO // 4, dtype=np.float32), tom(523.25, 0.5)])
+    inteiro = dominant_frequencies(y, SR_PADRAO)
+    blocos = [y[i:i + 3000] for i in range(0, len(y), 3000)]
+    streaming = np.concatenate(list(stream_frequencies(blocos, SR_PADRAO)))
+    np.testing.assert_array_equal(inteiro, streaming)
+    assert find_notes(y, SR_PADRAO)[:3] == ['A4'] * 3
+    assert find_notes(y, SR_PADRAO)[-3:] == ['C5'] * 3
+
+
+def test_stream_com_duracao_zero_nao_le_nada():
+    assert list(stream_notes(MUSICA, duration=0)) == []
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+from bench_pitch import FRAME_LENGTH, HOP_LENGTH, SR, TIMBRES, tone_set
+from pitch import ESTIMADORES, estimate, frequencies_to_notes
+
+NOTAS = range(40, 85, 4)  # E2 a E6
+
+
+def acerto(metodo, timbre, ruido=0.1):
+    """Fração dos quadros com a nota certa e erro mediano em cents, como no bench_pitch."""
+    acertos = quadros = 0
+    cents = []
+    for _, _, f0, y in [t for t in tone_set(NOTAS, 0.3, ruido) if t[0] == timbre]:
+        frames = sliding_window_view(y, FRAME_LENGTH)[::HOP_LENGTH]
+        freqs, _ = estimate(frames, SR, metodo)
+        esperada = frequencies_to_notes([f0])[0]
+        acertos += sum(nota == esperada for nota in frequencies_to_notes(freqs))
+        quadros += len(frames)
+        cents.append(np.abs(1200 * np.log2(freqs / f0)))
+    return acertos / quadros, np.median(np.concatenate(cents))
+
+
+def test_frequencies_to_notes():
+    assert frequencies_to_notes([440, 261.63, 27.5, 4186]) == ['A4', 'C4', 'A0', 'C8']
+    assert frequencies_to_notes([0, -1, np.nan, np.inf]) == [None] * 4
+
+
+@pytest.mark.parametrize('metodo', ['hps', 'yin'])
+@pytest.mark.parametrize('timbre', list(TIMBRES))
+def test_acerta_a_fundamental(metodo, timbre):
+    fracao, cents = acerto(metodo, timbre)
+    assert fracao >= 0.98
+    assert cents < 5
+
+
+def test_fft_pega_o_harmonico_mais_forte():
+    # Limitação conhecida do maior pico: com a fundamental fraca ele erra por oitava
+    assert acerto('fft', 'senoide')[0] >= 0.98
+    assert acerto('fft', 'fundamental-fraca')[0] < 0.1
+
+
+@pytest.mark.parametrize('metodo', list(ESTIMADORES))
+def test_confianca_baixa_no_ruido(metodo):
+    y = np.random.default_rng(0).normal(0, 0.1, SR).astype(np.float32)
+    frames = sliding_window_view(y, FRAME_LENGTH)[::HOP_LENGTH]
+    freqs, confianca = estimate(frames, SR, metodo)
+    assert freqs.shape == confianca.shape == (len(frames),)
+    assert confianca.mean() < 0.2
+
+
+def test_estimador_desconhecido():
+    with pytest.raises(ValueError):
+        estimate(np.zeros((1, FRAME_LENGTH)), SR, 'crepe')
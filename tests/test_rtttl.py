@@ -0,0 +1,54 @@
+import io
+import pytest
+from rtttl import RtttlWriter, clamp_note, format_token, quantize, to_rtttl
+
+BPM = 120  # Semínima = 0,5 s
+
+
+def test_clamp_note():
+    assert clamp_note('A4') == ('a', 4)
+    assert clamp_note('C#2') == ('c#', 4)
+    assert clamp_note('F10') == ('f', 7)
+    with pytest.raises(ValueError):
+        clamp_note('H4')
+
+
+def test_quantize():
+    assert quantize(0.5, BPM) == (4, False)
+    assert quantize(0.75, BPM) == (4, True)
+    assert quantize(2.0, BPM) == (1, False)
+    assert quantize(0.0625, BPM) == (32, False)
+    assert quantize(0.02, BPM) is None  # Menos de meia fusa
+
+
+def test_format_token():
+    assert format_token((4, False, 'a', 5)) == 'a'
+    assert format_token((8, True, 'c#', 6)) == '8c#6.'
+    assert format_token((16, False, None, None)) == '16p'
+
+
+def test_to_rtttl_junta_quadros_e_pausas():
+    quadros = ['A5'] * 10 + [None] * 5 + ['C6'] * 10  # 0,05 s por quadro
+    assert to_rtttl(quadros, 0.05, name='t', bpm=BPM) == 't:d=4,o=5,b=120:a,8p,c6'
+
+
+def test_trecho_curto_e_absorvido():
+    quadros = ['A5'] * 50 + ['B5'] + ['A5'] * 50  # B5 por 0,01 s: menos de meia fusa
+    assert to_rtttl(quadros, 0.01, name='t', bpm=BPM) == 't:d=2,o=5,b=120:a'
+
+
+def test_nota_longa_repete_semibreves():
+    # 5 s = semibreve (2 s) + semibreve pontuada (3 s)
+    assert to_rtttl(['E5'] * 100, 0.05, name='t', bpm=BPM) == 't:d=1,o=5,b=120:e,e.'
+
+
+def test_writer_igual_ao_lote():
+    quadros = ['A5'] * 10 + [None] * 5 + ['C6'] * 10 + ['G4'] * 3
+    f = io.StringIO()
+    writer = RtttlWriter(f, 0.05, name='t', bpm=BPM)
+    for nota in quadros:
+        writer.write(nota)
+    writer.close()
+    _, _, corpo = to_rtttl(quadros, 0.05, name='t', bpm=BPM).split(':')
+    assert f.getvalue().split(':')[2].split(',') == ['a', '8p', 'c6', '16g4']
+    assert len(corpo.split(',')) == writer.tokens == 4
@@ -0,0 +1,110 @@
+import os
+import pty
+import signal
+import threading
+import time
+import pytest
+from serial_ingest import BlockingSerialClient
+
+TIMEOUT = 0.1
+
+
+class Gravador(BlockingSerialClient):
+    """Cliente que só guarda os bytes recebidos, sem parse."""
+
+    def __init__(self, *args, **kwargs):
+        self.recebido = bytearray()
+        self.chegou = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def on_recieve(self, data):
+        self.recebido += data
+        self.chegou.set()
+
+
+@pytest.fixture
+def dispositivo():
+    """Par de pseudo-terminais: o lado mestre faz o papel do dispositivo serial."""
+    mestre, escravo = pty.openpty()
+    yield mestre, os.ttyname(escravo)
+    os.close(mestre)
+    os.close(escravo)
+
+
+def esperar(condicao, limite=2.0):
+    fim = time.monotonic() + limite
+    while not condicao():
+        if time.monotonic() > fim:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def enviar_em_pedacos(fd, dados, tamanhos=(1, 7, 64, 3, 500)):
+    i = 0
+    while i < len(dados):
+        for tamanho in tamanhos:
+            os.write(fd, dados[i:i + tamanho])
+            i += tamanho
+            time.sleep(0.001)  # Leituras separadas no leitor
+
+
+def mensagem(n, imagem=b''):
+    return b'\r{"type":1,"name":"INVOKE","code":0,"data":{"boxes":[[%d,20,30,40,90,0]],"image":"%s"}}\n' % (n, imagem)
+
+
+@pytest.fixture
+def cliente(dispositivo):
+    clientes = []
+
+    def criar(**kwargs):
+        c = Gravador(dispositivo[1], timeout=TIMEOUT, **kwargs)
+        c.loop_start()
+        clientes.append(c)
+        return c
+
+    yield criar
+    for c in clientes:
+        c.loop_stop()
+
+
+def test_mensagens_chegam_intactas(dispositivo, cliente):
+    c = cliente()
+    dados = b''.join(mensagem(n) for n in range(50))
+    enviar_em_pedacos(dispositivo[0], dados)
+    assert esperar(lambda: len(c.recebido) >= len(dados))
+    assert bytes(c.recebido) == dados
+    assert c.reader.bytes_lidos == len(dados)
+
+
+def test_boxes_only_corta_a_imagem(dispositivo, cliente):
+    c = cliente(boxes_only=True)
+    imagem = b'QUJD' * 2000
+    enviar_em_pedacos(dispositivo[0], b''.join(mensagem(n, imagem) for n in range(5)))
+    esperado = b''.join(mensagem(n) for n in range(5))
+    assert esperar(lambda: len(c.recebido) >= len(esperado))
+    assert bytes(c.recebido) == esperado
+    assert c.stripper.bytes_descartados == 5 * len(imagem)
+
+
+def test_stop_encerra_o_leitor(dispositivo, cliente):
+    c = cliente()
+    assert c.reader.is_alive()
+    inicio = time.monotonic()
+    c.loop_stop()
+    assert time.monotonic() - inicio < TIMEOUT * 5
+    assert not c.reader.is_alive()
+    assert not c.reader.running
+
+
+def test_sigint_encerra_o_leitor(dispositivo, cliente):
+    c = cliente()
+    threading.Timer(0.05, os.kill, (os.getpid(), signal.SIGINT)).start()
+    # Como no laço principal dos programas: Ctrl+C interrompe, depois loop_stop()
+    with pytest.raises(KeyboardInterrupt):
+        while True:
+            time.sleep(0.01)
+    inicio = time.monotonic()
+    c.loop_stop()
+    assert time.monotonic() - inicio < TIMEOUT * 5
+    assert not c.reader.is_alive()
@@ -0,0 +1,33 @@
+import random
+import pygame
+from bench_spatial_index import associar_indice, associar_linear, gerar_caixas, mover
+from spatial_index import RectIndex
+
+
+def test_mesmo_resultado_da_busca_linear():
+    # Mesma conferência do bench_spatial_index: o índice não muda a associação
+    rng = random.Random(0)
+    caixas = gerar_caixas(50, largura=1920, altura=1080, rng=rng)
+    linear, indice = [], []
+    for _ in range(30):
+        caixas = mover(caixas, rng)
+        linear = associar_linear(linear, caixas)
+        indice = associar_indice(indice, caixas)
+        assert linear == indice
+
+
+def test_consultas_em_ordem_de_insercao():
+    index = RectIndex([((0, 0, 10, 10), 'a'), ((5, 5, 10, 10), 'b'), ((50, 50, 5, 5), 'c')])
+    assert len(index) == 3
+    assert index.query((6, 6, 2, 2)) == ['a', 'b']
+    assert index.first((12, 12, 1, 1)) == 'b'
+    assert index.first((30, 30, 1, 1)) is None
+    assert not index.any((30, 30, 1, 1))
+
+
+def test_ve_o_rect_movido_depois_de_inserido():
+    rect = pygame.Rect(0, 0, 10, 10)
+    index = RectIndex([(rect, 'sprite')])
+    rect.update(100, 100, 10, 10)  # Como sprite.update() faz com sprite.rect
+    assert index.first((0, 0, 5, 5)) is None
+    assert index.first((102, 102, 5, 5)) == 'sprite'
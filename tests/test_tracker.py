@@ -0,0 +1,54 @@
+from tracker import CONFIRMED, LOST, TENTATIVE, IoUTracker, iou
+
+
+def test_iou():
+    assert iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert iou((0, 0, 10, 10), (5, 0, 10, 10)) == 50 / 150
+    assert iou((0, 0, 10, 10), (10, 0, 10, 10)) == 0.0
+
+
+def test_confirma_depois_de_min_hits():
+    tracker = IoUTracker(min_hits=3)
+    assert tracker.update([(0, 0, 50, 100)]) == []
+    assert tracker.tracks[0].state == TENTATIVE
+    assert tracker.update([(2, 0, 50, 100)]) == []
+    confirmadas = tracker.update([(4, 0, 50, 100)])
+    assert [t.state for t in confirmadas] == [CONFIRMED]
+
+
+def test_ids_estaveis_com_duas_pessoas_se_movendo():
+    tracker = IoUTracker(min_hits=1)
+    ids = None
+    for passo in range(15):
+        caixas = [(5 * passo, 0, 50, 100), (400 - 5 * passo, 0, 50, 100)]
+        confirmadas = tracker.update(caixas[::-1] if passo % 2 else caixas)  # A ordem das detecções não importa
+        atuais = [t.id for t in sorted(confirmadas, key=lambda t: t.box[0])]
+        if ids is None:
+            ids = atuais
+        assert atuais == ids
+    assert ids == [1, 2]
+    assert [round(t.vx) for t in tracker.tracks] == [5, -5]
+
+
+def test_tentativa_sem_caixa_e_descartada():
+    tracker = IoUTracker(min_hits=3)
+    tracker.update([(0, 0, 50, 100)])
+    tracker.update([])
+    assert tracker.tracks == []
+    assert tracker.removidas == [1]
+
+
+def test_perdida_volta_pela_previsao_e_expira():
+    tracker = IoUTracker(min_hits=1, max_age=2)
+    for x in (0, 10, 20):
+        tracker.update([(x, 0, 50, 100)])
+    track = tracker.tracks[0]
+    tracker.update([])
+    assert track.state == LOST
+    # A previsão anda 10 px por quadro: a caixa reaparece onde era esperada
+    assert tracker.update([(40, 0, 50, 100)])[0] is track
+    tracker.update([])
+    tracker.update([])
+    tracker.update([])
+    assert tracker.tracks == []
+    assert tracker.removidas == [track.id]
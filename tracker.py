@@ -0,0 +1,121 @@
+import itertools
+
+TENTATIVE = "tentative"  # Visto há poucos quadros, ainda pode ser ruído
+CONFIRMED = "confirmed"  # Associado em quadros suficientes seguidos
+LOST = "lost"  # Confirmado, mas sem caixa nos últimos quadros
+
+
+def iou(a, b):
+    """Intersecção sobre união de duas caixas (x, y, w, h)."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / (aw * ah + bw * bh - inter)
+
+
+class Track:
+    """Uma pessoa rastreada: caixa, velocidade constante e estado do ciclo de vida."""
+
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = tuple(box)  # Última caixa associada (x, y, w, h)
+        self.vx = 0.0  # Velocidade em pixels por quadro
+        self.vy = 0.0
+        self.hits = 1  # Quadros seguidos com caixa associada
+        self.age = 0  # Quadros desde a última associação
+        self.state = TENTATIVE
+
+    def predict(self):
+        """Caixa prevista para o quadro atual, supondo velocidade constante."""
+        x, y, w, h = self.box
+        passos = self.age + 1
+        return (x + self.vx * passos, y + self.vy * passos, w, h)
+
+    def update(self, box, suavizacao=0.5):
+        """Associa uma nova caixa e atualiza a velocidade (média móvel)."""
+        x, y, _, _ = self.box
+        passos = self.age + 1
+        self.vx += suavizacao * ((box[0] - x) / passos - self.vx)
+        self.vy += suavizacao * ((box[1] - y) / passos - self.vy)
+        self.box = tuple(box)
+        self.hits += 1
+        self.age = 0
+
+    @property
+    def matched(self):
+        """Se a track recebeu uma caixa neste quadro."""
+        return self.age == 0
+
+
+class IoUTracker:
+    """Rastreador multi-objeto por IoU com IDs estáveis.
+
+    A cada quadro, as caixas previstas das tracks são casadas com as detecções
+    pelo maior IoU (guloso). Tracks novas começam como TENTATIVE e viram CONFIRMED
+    depois de ``min_hits`` associações; uma track confirmada sem detecção fica LOST
+    e é removida depois de ``max_age`` quadros.
+    """
+
+    def __init__(self, iou_min=0.3, min_hits=3, max_age=15):
+        self.iou_min = iou_min
+        self.min_hits = min_hits
+        self.max_age = max_age
+        self.tracks = []
+        self.removidas = []  # IDs removidos no último update
+        self._ids = itertools.count(1)
+
+    def _associar(self, detections):
+        """Pares (track, detecção) com maior IoU primeiro, sem repetir nenhum dos dois."""
+        previstas = [t.predict() for t in self.tracks]
+        pares = []
+        for ti, prevista in enumerate(previstas):
+            for di, det in enumerate(detections):
+                valor = iou(prevista, det)
+                if valor >= self.iou_min:
+                    pares.append((valor, ti, di))
+        pares.sort(reverse=True)
+
+        usadas_t, usadas_d, casados = set(), set(), []
+        for _, ti, di in pares:
+            if ti in usadas_t or di in usadas_d:
+                continue
+            usadas_t.add(ti)
+            usadas_d.add(di)
+            casados.append((ti, di))
+        return casados, usadas_d
+
+    def update(self, detections):
+        """Processa as caixas (x, y, w, h) de um quadro e retorna as tracks confirmadas."""
+        casados, usadas_d = self._associar(detections)
+        casadas_t = set()
+        for ti, di in casados:
+            track = self.tracks[ti]
+            track.update(detections[di])
+            if track.state == LOST or track.hits >= self.min_hits:
+                track.state = CONFIRMED
+            casadas_t.add(ti)
+
+        self.removidas = []
+        vivas = []
+        for ti, track in enumerate(self.tracks):
+            if ti not in casadas_t:
+                track.age += 1
+                if track.state == TENTATIVE or track.age > self.max_age:
+                    self.removidas.append(track.id)
+                    continue
+                track.state = LOST
+            vivas.append(track)
+
+        for di, det in enumerate(detections):
+            if di not in usadas_d:
+                track = Track(next(self._ids), det)
+                if self.min_hits <= 1:
+                    track.state = CONFIRMED
+                vivas.append(track)
+
+        self.tracks = vivas
+        return [t for t in self.tracks if t.state == CONFIRMED]